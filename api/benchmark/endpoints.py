@@ -0,0 +1,391 @@
+"""
+Benchmark de carga da API (/search, /search/grouped, /search/batch, /rag,
+/rag/stream e /documents).
+
+Roda o app FastAPI no próprio processo, via httpx.ASGITransport, contra:
+
+- uma coleção local do qdrant-client (":memory:") com o esquema de
+  ingestao/create_collection.py, populada com chunks e vetores sintéticos
+- modelos de embedding e cliente OpenAI falsos (api/benchmark/fakes.py), com
+  latência controlável por modelo
+
+e mede, por endpoint e sob concorrência, p50/p95/p99 e requisições/s, além do
+tempo médio de cada etapa (lido do cabeçalho Server-Timing). Nada sai da
+máquina: não precisa de Qdrant, modelos baixados nem chave da OpenAI.
+
+O modo local do qdrant-client faz busca exata em Python, no próprio event
+loop: os números absolutos são pessimistas e crescem com --pontos. Servem
+para comparar commits com a mesma configuração, não para dimensionar produção.
+
+O resultado é gravado em JSON com o commit atual, para comparar entre commits:
+
+    python -m api.benchmark.endpoints --endpoints search rag --concorrencia 16
+    python -m api.benchmark.endpoints --comparar api/benchmark/resultados/anterior.json
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import subprocess
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+# as configurações da API exigem credenciais na importação; aqui os clientes
+# são locais ou falsos e esses valores nunca são usados
+os.environ.setdefault("QDRANT_URL", "http://localhost:6333")
+os.environ.setdefault("QDRANT_API_KEY", "benchmark")
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+
+import httpx
+import numpy as np
+from qdrant_client import AsyncQdrantClient, QdrantClient, models
+
+from api.benchmark.fakes import (
+    FakeAsyncOpenAI,
+    FakeColbertModel,
+    FakeDenseEncoder,
+    FakeOpenAI,
+    FakeSparseModel,
+    colbert_matrix,
+    dense_vector,
+    sparse_vector,
+)
+from api.config.search_profiles import build_profiles
+from api.config.settings import settings
+from api.dependencies import get_document_service, get_rag_service, get_search_service
+from api.services.answer_cache import SemanticAnswerCache
+from api.services.document_service import DocumentService
+from api.services.embeddings import EmbeddingsService
+from api.services.rag_service import RagService
+from api.services.search_cache import InMemorySearchCache
+from api.services.search_service import SearchService
+from ingestao.create_collection import (
+    COLLECTION_NAME,
+    SPARSE_VECTORS_CONFIG,
+    VECTORS_CONFIG,
+    fields_to_index,
+)
+
+RESULTADOS_DIR = Path(__file__).resolve().parent / "resultados"
+LOTE_UPSERT = 256
+TIPOS = ("Texto para Discussão", "Livro", "Nota Técnica", "Boletim", "Relatório de Pesquisa")
+VOCABULARIO = (
+    "desigualdade renda pobreza emprego informalidade salário mínimo inflação juros câmbio "
+    "política fiscal monetária previdência saúde educação saneamento habitação transporte "
+    "agricultura indústria comércio exterior produtividade inovação tecnologia meio ambiente "
+    "desmatamento energia crescimento investimento crédito tributação orçamento município "
+    "estado federação região nordeste amazônia urbano rural juventude gênero raça violência"
+).split()
+
+ENDPOINTS: Dict[str, Callable[[List[str], argparse.Namespace], Dict[str, Any]]] = {
+    "search": lambda consultas, args: {
+        "method": "POST", "url": "/search", "json": {"query": consultas[0], "limit": args.limit},
+    },
+    "grouped": lambda consultas, args: {
+        "method": "POST", "url": "/search/grouped",
+        "json": {"query": consultas[0], "limit": args.limit, "group_size": 2},
+    },
+    "batch": lambda consultas, args: {
+        "method": "POST", "url": "/search/batch",
+        "json": {"queries": [{"query": consulta, "limit": args.limit} for consulta in consultas]},
+    },
+    "rag": lambda consultas, args: {
+        "method": "POST", "url": "/rag", "json": {"query": consultas[0], "limit": args.limit},
+    },
+    # o ASGITransport entrega o corpo inteiro: mede o tempo até o evento done
+    "rag_stream": lambda consultas, args: {
+        "method": "POST", "url": "/rag/stream", "json": {"query": consultas[0], "limit": args.limit},
+    },
+    "documents": lambda consultas, args: {
+        "method": "GET", "url": "/documents", "params": {"limit": 50},
+    },
+}
+
+
+def _commit_atual() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _texto(rng: np.random.Generator, palavras: int) -> str:
+    return " ".join(rng.choice(VOCABULARIO, size=palavras))
+
+
+def gerar_consultas(quantidade: int, seed: int = 1) -> List[str]:
+    """Consultas curtas do mesmo vocabulário dos chunks (o sparse encontra termos em comum)."""
+    rng = np.random.default_rng(seed)
+    return [_texto(rng, int(rng.integers(2, 7))) for _ in range(quantidade)]
+
+
+async def criar_colecao(qdrant: AsyncQdrantClient, pontos: int, documentos: int, seed: int = 0) -> None:
+    """
+    Coleção com o esquema de produção. A quantização e o on_disk do esquema
+    não têm efeito no modo local; os índices de payload são criados do mesmo jeito.
+    """
+    await qdrant.create_collection(
+        collection_name=COLLECTION_NAME,
+        vectors_config=VECTORS_CONFIG,
+        sparse_vectors_config=SPARSE_VECTORS_CONFIG,
+    )
+    for field_name, schema in fields_to_index:
+        await qdrant.create_payload_index(COLLECTION_NAME, field_name=field_name, field_schema=schema)
+
+    rng = np.random.default_rng(seed)
+    for inicio in range(0, pontos, LOTE_UPSERT):
+        lote = []
+        for i in range(inicio, min(inicio + LOTE_UPSERT, pontos)):
+            doc = i % documentos
+            texto = _texto(rng, 120)
+            indices, values = sparse_vector(texto)
+            lote.append(models.PointStruct(
+                id=str(uuid.UUID(int=i + 1)),
+                vector={
+                    "dense": dense_vector(texto).tolist(),
+                    "sparse": models.SparseVector(indices=indices.tolist(), values=values.tolist()),
+                    "colbert": colbert_matrix(texto, tokens=32).tolist(),
+                },
+                payload={
+                    "text": texto,
+                    "metadata": {
+                        "document_id": f"bench-{doc:05d}",
+                        "titulo": f"Publicação sintética {doc}",
+                        "autores": "Fulano de Tal; Beltrana Souza" if doc % 2 else "Ciclano Silva",
+                        "ano": 2000 + doc % 25,
+                        "tipo_conteudo": TIPOS[doc % len(TIPOS)],
+                        "link_pdf": f"https://repositorio.ipea.gov.br/bench/{doc}.pdf",
+                        "link_download": f"https://repositorio.ipea.gov.br/bench/{doc}",
+                        "chunk_index": i // documentos,
+                    },
+                },
+            ))
+        await qdrant.upsert(COLLECTION_NAME, points=lote, wait=True)
+
+
+def criar_servicos(qdrant: AsyncQdrantClient, args: argparse.Namespace):
+    embeddings = EmbeddingsService(
+        dense_model=FakeDenseEncoder(args.latencia_dense, args.latencia_por_consulta),
+        sparse_model=FakeSparseModel(args.latencia_sparse),
+        colbert_model=FakeColbertModel(args.latencia_colbert, args.latencia_por_consulta),
+    )
+    # o cliente síncrono só serve os caminhos síncronos, que as rotas não usam
+    qdrant_sync = QdrantClient(":memory:")
+
+    search_service = SearchService(
+        qdrant_url=settings.qdrant_url,
+        qdrant_api_key=settings.qdrant_api_key,
+        collection_name=COLLECTION_NAME,
+        search_cache=InMemorySearchCache(args.cache) if args.cache > 0 else None,
+        embedding_workers=settings.embedding_workers,
+        embedding_batch_window_ms=args.janela_ms,
+        embedding_batch_max_size=settings.embedding_batch_max_size,
+        profiles=build_profiles(settings.search_profiles),
+        default_profile=args.perfil,
+        batch_size=settings.search_batch_size,
+        qdrant=qdrant_sync,
+        async_qdrant=qdrant,
+        embeddings_service=embeddings,
+    )
+    rag_service = RagService(
+        search_service,
+        openai=FakeOpenAI(args.latencia_llm),
+        async_openai=FakeAsyncOpenAI(args.latencia_llm, por_token_ms=args.latencia_por_token),
+        # os vetores falsos não capturam paráfrases: só perguntas repetidas acertam
+        answer_cache=SemanticAnswerCache(args.cache_rag) if args.cache_rag > 0 else None,
+    )
+    document_service = DocumentService(
+        qdrant_url=settings.qdrant_url,
+        qdrant_api_key=settings.qdrant_api_key,
+        collection_name=COLLECTION_NAME,
+        qdrant=qdrant_sync,
+        async_qdrant=qdrant,
+    )
+    return search_service, rag_service, document_service
+
+
+def _ler_server_timing(valor: str | None) -> Dict[str, float]:
+    etapas = {}
+    for entrada in (valor or "").split(","):
+        nome, _, resto = entrada.strip().partition(";dur=")
+        if nome and resto:
+            etapas[nome] = float(resto)
+    return etapas
+
+
+def _percentis(latencias: List[float]) -> Dict[str, float]:
+    if not latencias:
+        return {}
+    ms = np.array(latencias) * 1000
+    return {
+        "p50": float(np.percentile(ms, 50)),
+        "p95": float(np.percentile(ms, 95)),
+        "p99": float(np.percentile(ms, 99)),
+        "media": float(ms.mean()),
+        "max": float(ms.max()),
+    }
+
+
+async def medir_endpoint(
+    client: httpx.AsyncClient,
+    nome: str,
+    consultas: List[str],
+    args: argparse.Namespace,
+) -> Dict[str, Any]:
+    montar = ENDPOINTS[nome]
+    consultas_ciclo = itertools.cycle(consultas)
+    por_requisicao = args.lote if nome == "batch" else 1
+
+    def proxima_requisicao() -> Dict[str, Any]:
+        return montar([next(consultas_ciclo) for _ in range(por_requisicao)], args)
+
+    for _ in range(args.aquecimento):
+        await client.request(**proxima_requisicao())
+
+    contador = itertools.count()
+    latencias: List[float] = []
+    etapas: Dict[str, float] = defaultdict(float)
+    erros = 0
+
+    async def trabalhador():
+        nonlocal erros
+        while next(contador) < args.requisicoes:
+            requisicao = proxima_requisicao()
+            inicio = time.perf_counter()
+            resposta = await client.request(**requisicao, headers={"X-Server-Timing": "1"})
+            latencia = time.perf_counter() - inicio
+            if resposta.status_code != 200:
+                erros += 1
+                continue
+            latencias.append(latencia)
+            for etapa, ms in _ler_server_timing(resposta.headers.get("server-timing")).items():
+                etapas[etapa] += ms
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*(trabalhador() for _ in range(args.concorrencia)))
+    duracao = time.perf_counter() - inicio
+
+    resultado = {
+        "requisicoes": args.requisicoes,
+        "erros": erros,
+        "segundos": duracao,
+        "rps": len(latencias) / duracao if duracao > 0 else 0.0,
+        "latencia_ms": _percentis(latencias),
+        # média por requisição bem-sucedida; etapas concorrentes podem somar mais que o total
+        "etapas_ms": {etapa: total / len(latencias) for etapa, total in etapas.items()} if latencias else {},
+    }
+    latencia = resultado["latencia_ms"]
+    print(
+        f"[{nome}] {resultado['rps']:.1f} req/s, p50 {latencia.get('p50', 0):.1f} ms, "
+        f"p95 {latencia.get('p95', 0):.1f} ms, p99 {latencia.get('p99', 0):.1f} ms, {erros} erros"
+    )
+    return resultado
+
+
+async def rodar_benchmark(args: argparse.Namespace) -> Dict[str, Dict[str, Any]]:
+    qdrant = AsyncQdrantClient(":memory:")
+    inicio = time.perf_counter()
+    await criar_colecao(qdrant, args.pontos, args.documentos)
+    print(f"Coleção local com {args.pontos} pontos criada em {time.perf_counter() - inicio:.1f}s")
+
+    search_service, rag_service, document_service = criar_servicos(qdrant, args)
+    await search_service.warmup()
+
+    # sem o lifespan: os serviços de produção não são construídos
+    from api.main import app
+
+    app.dependency_overrides[get_search_service] = lambda: search_service
+    app.dependency_overrides[get_rag_service] = lambda: rag_service
+    app.dependency_overrides[get_document_service] = lambda: document_service
+
+    consultas = gerar_consultas(args.consultas)
+    resultados = {}
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=None) as client:
+            for nome in args.endpoints:
+                resultados[nome] = await medir_endpoint(client, nome, consultas, args)
+    finally:
+        app.dependency_overrides.clear()
+        await rag_service.aclose()
+        await search_service.aclose()
+        await qdrant.close()
+
+    return resultados
+
+
+def comparar(atual: Dict[str, Any], anterior: Dict[str, Any]) -> None:
+    metricas = [
+        ("rps", lambda r: r.get("rps")),
+        ("p50_ms", lambda r: r.get("latencia_ms", {}).get("p50")),
+        ("p95_ms", lambda r: r.get("latencia_ms", {}).get("p95")),
+        ("p99_ms", lambda r: r.get("latencia_ms", {}).get("p99")),
+    ]
+
+    print(f"\nComparação com {anterior.get('commit')} ({anterior.get('timestamp')}):")
+    for nome, resultado in atual["resultados"].items():
+        base = anterior.get("resultados", {}).get(nome)
+        if not base:
+            continue
+        for metrica, valor in metricas:
+            novo, velho = valor(resultado), valor(base)
+            if novo is None or not velho:
+                continue
+            print(f"  {nome:<10} {metrica:<7} {velho:>10.2f} -> {novo:>10.2f} ({(novo - velho) / velho:+.1%})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de carga da API")
+    parser.add_argument("--endpoints", nargs="+", choices=list(ENDPOINTS), default=["search", "rag"])
+    parser.add_argument("--requisicoes", type=int, default=200, help="requisições medidas por endpoint")
+    parser.add_argument("--concorrencia", type=int, default=16)
+    parser.add_argument("--aquecimento", type=int, default=20, help="requisições descartadas antes da medição")
+    parser.add_argument("--pontos", type=int, default=1000, help="chunks na coleção local")
+    parser.add_argument("--documentos", type=int, default=100)
+    parser.add_argument("--consultas", type=int, default=2000, help="consultas distintas (repetições acertam os caches)")
+    parser.add_argument("--lote", type=int, default=8, help="consultas por requisição em /search/batch")
+    parser.add_argument("--limit", type=int, default=5)
+    parser.add_argument("--perfil", default=settings.search_profile)
+    parser.add_argument("--cache", type=int, default=0, help="tamanho do cache de busca (0 desativa)")
+    parser.add_argument("--cache-rag", type=int, default=0, help="tamanho do cache semântico do /rag (0 desativa)")
+    parser.add_argument("--janela-ms", type=float, default=settings.embedding_batch_window_ms)
+    parser.add_argument("--latencia-dense", type=float, default=25.0, help="ms por chamada ao modelo denso")
+    parser.add_argument("--latencia-sparse", type=float, default=1.0)
+    parser.add_argument("--latencia-colbert", type=float, default=10.0)
+    parser.add_argument("--latencia-por-consulta", type=float, default=2.0, help="ms extras por consulta do lote")
+    parser.add_argument("--latencia-llm", type=float, default=500.0)
+    parser.add_argument("--latencia-por-token", type=float, default=0.0, help="ms entre tokens no /rag/stream")
+    parser.add_argument("--saida", type=Path, default=RESULTADOS_DIR)
+    parser.add_argument("--comparar", type=Path, default=None)
+    args = parser.parse_args()
+
+    commit = _commit_atual()
+    timestamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    resultado = {
+        "commit": commit,
+        "timestamp": timestamp,
+        "config": {
+            chave: valor for chave, valor in vars(args).items() if chave not in ("saida", "comparar")
+        },
+        "resultados": asyncio.run(rodar_benchmark(args)),
+    }
+
+    args.saida.mkdir(parents=True, exist_ok=True)
+    destino = args.saida / f"endpoints_{timestamp}_{commit or 'sem-commit'}.json"
+    destino.write_text(json.dumps(resultado, indent=2, ensure_ascii=False), encoding="utf-8")
+    print(f"\nResultados gravados em {destino}")
+
+    if args.comparar:
+        comparar(resultado, json.loads(args.comparar.read_text(encoding="utf-8")))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""
+Modelos de embedding e cliente OpenAI falsos, com latência controlável.
+
+Os vetores são determinísticos (derivados do hash da consulta) e têm as
+dimensões reais (denso 1024, ColBERT n x 128), de modo que o Qdrant e a
+serialização trabalham com o mesmo volume de dados da produção. A latência é
+simulada com time.sleep, que libera o GIL como o ONNX Runtime.
+"""
+import asyncio
+import hashlib
+import time
+from types import SimpleNamespace
+from typing import Iterator, List
+
+import numpy as np
+
+DENSE_DIM = 1024
+COLBERT_DIM = 128
+
+
+def _hash(text: str, bytes_: int = 8) -> int:
+    return int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=bytes_).digest(), "little")
+
+
+def _rng(text: str) -> np.random.Generator:
+    return np.random.default_rng(_hash(text))
+
+
+def dense_vector(text: str) -> np.ndarray:
+    vector = _rng(text).standard_normal(DENSE_DIM).astype(np.float32)
+    return vector / np.linalg.norm(vector)
+
+
+def sparse_vector(text: str) -> tuple[np.ndarray, np.ndarray]:
+    # um índice por palavra, como o BM25 (hash do termo)
+    termos = sorted({_hash(termo, 4) for termo in text.lower().split()})
+    return np.array(termos, dtype=np.int64), np.ones(len(termos), dtype=np.float32)
+
+
+def colbert_matrix(text: str, tokens: int | None = None) -> np.ndarray:
+    tokens = tokens or min(max(len(text.split()) + 2, 4), 32)
+    return _rng(text).standard_normal((tokens, COLBERT_DIM)).astype(np.float32)
+
+
+class _Latencia:
+    """Latência por chamada ao modelo mais um custo por consulta do lote."""
+
+    def __init__(self, latencia_ms: float = 0.0, por_item_ms: float = 0.0):
+        self.latencia_ms = latencia_ms
+        self.por_item_ms = por_item_ms
+        self.chamadas = 0
+
+    def esperar(self, itens: int) -> None:
+        self.chamadas += 1
+        segundos = (self.latencia_ms + self.por_item_ms * itens) / 1000
+        if segundos > 0:
+            time.sleep(segundos)
+
+
+class FakeDenseEncoder(_Latencia):
+    """Mesma interface do DenseEncoder (shared.model_registry)."""
+
+    def embed_queries(self, texts: List[str], batch_size: int = 32) -> np.ndarray:
+        self.esperar(len(texts))
+        return np.stack([dense_vector(text) for text in texts])
+
+
+class FakeSparseModel(_Latencia):
+    """Mesma interface do SparseTextEmbedding do fastembed."""
+
+    def query_embed(self, texts: List[str], batch_size: int = 32) -> Iterator[SimpleNamespace]:
+        self.esperar(len(texts))
+        for text in texts:
+            indices, values = sparse_vector(text)
+            yield SimpleNamespace(indices=indices, values=values)
+
+
+class FakeColbertModel(_Latencia):
+    """Mesma interface do LateInteractionTextEmbedding do fastembed."""
+
+    def query_embed(self, texts: List[str], batch_size: int = 32) -> Iterator[np.ndarray]:
+        self.esperar(len(texts))
+        for text in texts:
+            yield colbert_matrix(text)
+
+
+class _FakeCompletions:
+    def __init__(self, latencia_ms: float, resposta: str, por_token_ms: float = 0.0):
+        self.latencia_ms = latencia_ms
+        self.resposta = resposta
+        self.por_token_ms = por_token_ms
+        self.chamadas = 0
+
+    def _response(self, kwargs: dict) -> SimpleNamespace:
+        self.chamadas += 1
+        return SimpleNamespace(
+            model=kwargs.get("model"),
+            choices=[SimpleNamespace(message=SimpleNamespace(role="assistant", content=self.resposta))],
+        )
+
+    def _tokens(self) -> list[str]:
+        # uma palavra por chunk, com o espaço, como os deltas da OpenAI
+        palavras = self.resposta.split(" ")
+        return [palavra if i == 0 else f" {palavra}" for i, palavra in enumerate(palavras)]
+
+    @staticmethod
+    def _chunk(content: str | None) -> SimpleNamespace:
+        return SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=content))])
+
+
+class _FakeAsyncStream:
+    """latencia_ms até o primeiro chunk e por_token_ms entre os seguintes."""
+
+    def __init__(self, completions: "_FakeAsyncCompletions"):
+        self.completions = completions
+
+    async def __aiter__(self):
+        await asyncio.sleep(self.completions.latencia_ms / 1000)
+        for i, token in enumerate(self.completions._tokens()):
+            if i:
+                await asyncio.sleep(self.completions.por_token_ms / 1000)
+            yield self.completions._chunk(token)
+        # último chunk da OpenAI: sem conteúdo
+        yield self.completions._chunk(None)
+
+    async def close(self) -> None:
+        pass
+
+
+class _FakeAsyncCompletions(_FakeCompletions):
+    async def create(self, stream: bool = False, **kwargs):
+        if stream:
+            self.chamadas += 1
+            return _FakeAsyncStream(self)
+        await asyncio.sleep(self.latencia_ms / 1000)
+        return self._response(kwargs)
+
+
+class _FakeSyncCompletions(_FakeCompletions):
+    def create(self, **kwargs) -> SimpleNamespace:
+        time.sleep(self.latencia_ms / 1000)
+        return self._response(kwargs)
+
+
+RESPOSTA_PADRAO = "Resposta sintética do benchmark, sem chamada ao modelo de linguagem."
+
+
+class FakeAsyncOpenAI:
+    """Só o que o RagService usa: chat.completions.create (com e sem stream) e close."""
+
+    def __init__(self, latencia_ms: float = 0.0, resposta: str = RESPOSTA_PADRAO, por_token_ms: float = 0.0):
+        self.chat = SimpleNamespace(completions=_FakeAsyncCompletions(latencia_ms, resposta, por_token_ms))
+
+    async def close(self) -> None:
+        pass
+
+
+class FakeOpenAI:
+    def __init__(self, latencia_ms: float = 0.0, resposta: str = RESPOSTA_PADRAO):
+        self.chat = SimpleNamespace(completions=_FakeSyncCompletions(latencia_ms, resposta))
+
+    def close(self) -> None:
+        pass
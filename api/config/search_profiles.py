@@ -0,0 +1,82 @@
+"""
+Perfis de busca: cada um troca precisão por latência de um jeito.
+
+- fast: RRF de denso + sparse, sem ColBERT (o embedding ColBERT nem é calculado)
+- balanced: pipeline original (prefetch 20 + 20, RRF, rerank ColBERT)
+- deep: prefetch maior, hnsw_ef alto e rescoring da quantização com oversampling
+
+Os valores podem ser sobrescritos por SEARCH_PROFILES (JSON), ex.:
+    SEARCH_PROFILES='{"deep": {"dense_limit": 200}, "tool": {"use_sparse": false, "use_colbert": false}}'
+"""
+from dataclasses import asdict, dataclass, replace
+
+from qdrant_client import models
+
+
+@dataclass(frozen=True)
+class SearchProfile:
+    name: str
+    dense_limit: int = 20
+    sparse_limit: int = 20
+    # candidatos que saem da fusão RRF para o rerank ColBERT
+    fusion_limit: int = 20
+    use_sparse: bool = True
+    use_colbert: bool = True
+    hnsw_ef: int | None = None
+    # quantização: rescore com os vetores originais e fator de oversampling
+    rescore: bool | None = None
+    oversampling: float | None = None
+
+    @property
+    def embeddings(self) -> tuple[str, ...]:
+        """Modelos que precisam rodar para este perfil."""
+        kinds = ["dense"]
+        if self.use_sparse:
+            kinds.append("sparse")
+        if self.use_colbert:
+            kinds.append("colbert")
+        return tuple(kinds)
+
+    def search_params(self) -> models.SearchParams | None:
+        quantization = None
+        if self.rescore is not None or self.oversampling is not None:
+            quantization = models.QuantizationSearchParams(
+                rescore=self.rescore,
+                oversampling=self.oversampling,
+            )
+        if self.hnsw_ef is None and quantization is None:
+            return None
+        return models.SearchParams(hnsw_ef=self.hnsw_ef, quantization=quantization)
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+DEFAULT_PROFILES: dict[str, SearchProfile] = {
+    "fast": SearchProfile(
+        name="fast",
+        dense_limit=20,
+        sparse_limit=20,
+        use_colbert=False,
+        hnsw_ef=64,
+    ),
+    "balanced": SearchProfile(name="balanced"),
+    "deep": SearchProfile(
+        name="deep",
+        dense_limit=100,
+        sparse_limit=100,
+        fusion_limit=50,
+        hnsw_ef=256,
+        rescore=True,
+        oversampling=2.0,
+    ),
+}
+
+
+def build_profiles(overrides: dict[str, dict] | None = None) -> dict[str, SearchProfile]:
+    """Perfis padrão com as sobrescritas aplicadas; nomes novos partem de 'balanced'."""
+    profiles = dict(DEFAULT_PROFILES)
+    for name, values in (overrides or {}).items():
+        base = profiles.get(name, DEFAULT_PROFILES["balanced"])
+        profiles[name] = replace(base, **{**values, "name": name})
+    return profiles
@@ -10,10 +10,69 @@ class Settings(BaseSettings):
     qdrant_url: str
     qdrant_api_key: str
     collecion_name: str = "publicacoes_ipea"
+    # cliente compartilhado (shared/qdrant.py): gRPC, conexões no pool,
+    # keep-alive (s) e timeout (s) por operação
+    qdrant_prefer_grpc: bool = False
+    qdrant_grpc_port: int = 6334
+    qdrant_pool_size: int = 16
+    qdrant_keepalive: float = 30.0
+    qdrant_timeout: int = 30
 
     dense_model: str = "intfloat/multilingual-e5-large"
     sparse_model: str = "Qdrant/bm25"
     colbert_model: str = "colbert-ir/colbertv2.0"
+    # backend do modelo denso: "fastembed" (ONNX) ou "sentence-transformers" (PyTorch)
+    embedding_backend: str = "fastembed"
+    # cache LRU dos embeddings de consulta (0 desativa; ttl em segundos, None = sem expiração)
+    embedding_cache_size: int = 10_000
+    embedding_cache_ttl: float | None = None
+
+    # cache de resultados de busca: "memory" (por processo), "redis" (compartilhado) ou "none"
+    search_cache_backend: str = "memory"
+    search_cache_url: str | None = None
+    search_cache_size: int = 2_000
+    search_cache_ttl: float | None = 3_600
+    # cache semântico das respostas do /rag (0 desativa, o padrão): pergunta com as
+    # mesmas fontes de uma já respondida e similaridade >= paraphrase_threshold, ou
+    # >= threshold com o mesmo texto normalizado, reaproveita a resposta
+    rag_cache_size: int = 0
+    rag_cache_threshold: float = 0.95
+    rag_cache_paraphrase_threshold: float = 0.99
+    rag_cache_ttl: float | None = 86_400
+    # intervalo máximo (s) entre leituras da versão da coleção no Qdrant
+    collection_version_ttl: float = 5.0
+    # threads que geram embeddings de consulta nas rotas assíncronas (fora do event loop)
+    embedding_workers: int = 4
+    # threads para os modelos sparse e ColBERT, que rodam em paralelo ao denso
+    embedding_encoder_workers: int = 8
+    # micro-batching: consultas que chegam dentro da janela (ms) viram um único lote
+    # por modelo, até embedding_batch_max_size consultas (0 ms desativa)
+    embedding_batch_window_ms: float = 0.0
+    embedding_batch_max_size: int = 32
+    # servidor de embeddings compartilhado pelos workers (api/services/embedding_server.py):
+    # com o caminho do socket Unix, a API não carrega os modelos e consulta o servidor
+    embedding_server_socket: str | None = None
+    embedding_server_authkey: str | None = None
+    embedding_server_window_ms: float = 5.0
+    embedding_server_timeout: float = 30.0
+
+    # carrega modelos, aquece e conecta ao Qdrant na subida (readiness em /health/ready)
+    eager_startup: bool = True
+    # intervalo (s) entre tentativas de aquecimento quando o Qdrant ainda não responde
+    warmup_retry_interval: float = 5.0
+
+    # perfil de busca padrão (fast | balanced | deep) e sobrescritas por perfil,
+    # ver api/config/search_profiles.py
+    search_profile: str = "balanced"
+    search_profiles: dict[str, dict] = {}
+    # consultas por chamada ao query_batch_points em /search/batch
+    search_batch_size: int = 64
+    # limite de consultas por requisição em /search/batch (acima disso, 422)
+    search_batch_max_queries: int = 64
+
+    # SQLite do MetadataDB usado como catálogo de documentos em /documents;
+    # None usa data/banco1.db, e sem o arquivo a listagem cai no scroll do Qdrant
+    metadata_db_path: str | None = None
 
     openai_api_key: str
     openai_model: str = "gpt-4o-mini"
@@ -1,9 +1,44 @@
+import logging
 from functools import lru_cache
 
+from api.config.search_profiles import build_profiles
 from api.config.settings import settings
+from api.services.answer_cache import create_answer_cache
+from api.services.catalog import DocumentCatalog
 from api.services.document_service import DocumentService
+from api.services.embedding_server import RemoteEmbeddingsService
 from api.services.rag_service import RagService
+from api.services.search_cache import create_search_cache
 from api.services.search_service import SearchService
+from ingestao.db.banco_metadados import DB_PATH
+from shared.qdrant import QdrantConfig, get_async_qdrant_client, get_qdrant_client
+
+
+logger = logging.getLogger(__name__)
+
+
+def get_qdrant_config() -> QdrantConfig:
+    return QdrantConfig(
+        url=settings.qdrant_url,
+        api_key=settings.qdrant_api_key,
+        prefer_grpc=settings.qdrant_prefer_grpc,
+        grpc_port=settings.qdrant_grpc_port,
+        pool_size=settings.qdrant_pool_size,
+        keepalive=settings.qdrant_keepalive,
+        timeout=settings.qdrant_timeout,
+    )
+
+
+def get_embeddings_service() -> RemoteEmbeddingsService | None:
+    """Com EMBEDDING_SERVER_SOCKET, os embeddings vêm do servidor compartilhado."""
+    if not settings.embedding_server_socket:
+        # modelos no próprio processo, carregados pelo SearchService
+        return None
+    return RemoteEmbeddingsService(
+        settings.embedding_server_socket,
+        authkey=settings.embedding_server_authkey,
+        timeout=settings.embedding_server_timeout,
+    )
 
 
 @lru_cache
@@ -12,12 +47,44 @@ def get_search_service() -> SearchService:
         qdrant_url=settings.qdrant_url,
         qdrant_api_key=settings.qdrant_api_key,
         collection_name=settings.collecion_name,
+        search_cache=create_search_cache(
+            backend=settings.search_cache_backend,
+            size=settings.search_cache_size,
+            ttl=settings.search_cache_ttl,
+            url=settings.search_cache_url,
+        ),
+        collection_version_ttl=settings.collection_version_ttl,
+        embedding_workers=settings.embedding_workers,
+        embedding_batch_window_ms=settings.embedding_batch_window_ms,
+        embedding_batch_max_size=settings.embedding_batch_max_size,
+        profiles=build_profiles(settings.search_profiles),
+        default_profile=settings.search_profile,
+        batch_size=settings.search_batch_size,
+        qdrant=get_qdrant_client(get_qdrant_config()),
+        async_qdrant=get_async_qdrant_client(get_qdrant_config()),
+        embeddings_service=get_embeddings_service(),
     )
 
 
 @lru_cache
 def get_rag_service() -> RagService:
-    return RagService(search_service=get_search_service())
+    return RagService(
+        search_service=get_search_service(),
+        answer_cache=create_answer_cache(
+            size=settings.rag_cache_size,
+            threshold=settings.rag_cache_threshold,
+            paraphrase_threshold=settings.rag_cache_paraphrase_threshold,
+            ttl=settings.rag_cache_ttl,
+        ),
+    )
+
+
+def get_document_catalog() -> DocumentCatalog | None:
+    try:
+        return DocumentCatalog(settings.metadata_db_path or DB_PATH)
+    except FileNotFoundError as exc:
+        logger.warning("Catalogo de documentos indisponivel (%s); /documents usara o scroll do Qdrant", exc)
+        return None
 
 
 @lru_cache
@@ -26,4 +93,7 @@ def get_document_service() -> DocumentService:
         qdrant_url=settings.qdrant_url,
         qdrant_api_key=settings.qdrant_api_key,
         collection_name=settings.collecion_name,
+        catalog=get_document_catalog(),
+        qdrant=get_qdrant_client(get_qdrant_config()),
+        async_qdrant=get_async_qdrant_client(get_qdrant_config()),
     )
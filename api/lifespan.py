@@ -0,0 +1,104 @@
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+
+from fastapi import FastAPI
+
+from api.config.settings import settings
+from api.dependencies import get_document_service, get_rag_service, get_search_service
+from shared.qdrant import aclose_qdrant_clients
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Readiness:
+    """Estado exposto em /health/ready."""
+
+    ready: bool = False
+    error: str | None = None
+    attempts: int = 0
+    started_at: float = field(default_factory=time.monotonic)
+    warmup_seconds: float | None = None
+
+    def as_dict(self) -> dict:
+        return {
+            "status": "ready" if self.ready else "starting",
+            "error": self.error,
+            "attempts": self.attempts,
+            "warmup_seconds": self.warmup_seconds,
+        }
+
+
+readiness = Readiness()
+
+
+async def warmup() -> None:
+    """
+    Constrói os serviços, carrega e aquece os modelos e abre a conexão com o
+    Qdrant. Em caso de falha tenta de novo; os modelos já carregados ficam no
+    registro, então só o que faltou é refeito.
+    """
+    while True:
+        readiness.attempts += 1
+        try:
+            get_document_service()
+            get_rag_service()
+            await get_search_service().warmup()
+        except Exception as exc:
+            readiness.error = f"{type(exc).__name__}: {exc}"
+            logger.warning("Falha no aquecimento (tentativa %d)", readiness.attempts, exc_info=True)
+            await asyncio.sleep(settings.warmup_retry_interval)
+            continue
+
+        readiness.ready = True
+        readiness.error = None
+        readiness.warmup_seconds = time.monotonic() - readiness.started_at
+        logger.info("API pronta em %.1fs", readiness.warmup_seconds)
+        return
+
+
+async def close_services() -> None:
+    # só fecha o que chegou a ser construído
+    for getter in (get_rag_service, get_search_service):
+        if getter.cache_info().currsize:
+            try:
+                await getter().aclose()
+            except Exception:
+                logger.warning("Falha ao encerrar %s", getter.__name__, exc_info=True)
+            getter.cache_clear()
+    get_document_service.cache_clear()
+
+    # os clientes do Qdrant são compartilhados pelos serviços: fecham por último
+    try:
+        await aclose_qdrant_clients()
+    except Exception:
+        logger.warning("Falha ao encerrar os clientes do Qdrant", exc_info=True)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    readiness.ready = False
+    readiness.started_at = time.monotonic()
+
+    task = None
+    if settings.eager_startup:
+        # em segundo plano: /health/live responde enquanto os modelos carregam
+        task = asyncio.create_task(warmup())
+    else:
+        readiness.ready = True
+
+    try:
+        yield
+    finally:
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        readiness.ready = False
+        await close_services()
@@ -1,9 +1,11 @@
 import uvicorn
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from api.routers import document_router, rag_router, search_router
+from api.lifespan import lifespan
+from api.routers import document_router, health_router, metrics_router, rag_router, search_router
+from api.services.metrics import MetricsMiddleware
 
-app = FastAPI(title="API de busca das publicações do IPEA")
+app = FastAPI(title="API de busca das publicações do IPEA", lifespan=lifespan)
 
 
 # 🔥 CONFIGURAÇÃO DE CORS
@@ -21,13 +23,19 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],    # permite OPTIONS, POST, GET etc
     allow_headers=["*"],
+    expose_headers=["Server-Timing"],
 )
 
+# latência por rota/etapa, requisições em andamento e Server-Timing sob demanda
+app.add_middleware(MetricsMiddleware)
+
 
 # adiciona os roteadores para as rotas de busca e RAG
 app.include_router(search_router.router)
 app.include_router(rag_router.router)
 app.include_router(document_router.router)
+app.include_router(health_router.router)
+app.include_router(metrics_router.router)
 
 
 @app.get("/")
@@ -17,7 +17,13 @@ class DocumentDetail(DocumentBase):
 
 class DocumentListResponse(BaseModel):
     documentos: List[DocumentBase]
+    total: Optional[int] = None
+    next_cursor: Optional[str] = None
 
 
 class DocumentDetailResponse(BaseModel):
-    documentos: List[DocumentDetail]
\ No newline at end of file
+    documentos: List[DocumentDetail]
+    # total de documentos que atendem aos filtros e cursor da próxima página
+    # (preenchidos quando a listagem vem do catálogo)
+    total: Optional[int] = None
+    next_cursor: Optional[str] = None
\ No newline at end of file
@@ -1,8 +1,18 @@
-from pydantic import BaseModel
+from typing import List, Optional
+
+from pydantic import BaseModel, field_validator
+from api.models.search_models import SearchFilters, validar_campos
 
 class RAGRequest(BaseModel):
     query: str
     limit: int = 3
+    profile: str | None = None
+    filters: SearchFilters | None = None
+    # campos de metadados devolvidos em metadata (o texto do chunk é sempre lido);
+    # None usa RAG_FIELDS do RagService
+    fields: Optional[List[str]] = None
+
+    _validar_fields = field_validator("fields")(validar_campos)
 
 class RAGResponse(BaseModel):
     """pergunta e resposta"""
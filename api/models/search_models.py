@@ -1,23 +1,91 @@
 """aqui são os modelos de busca, ou seja,
  os modelos que serão usados para buscar os dados no banco de dados"""
 
-from pydantic import BaseModel
-from typing import List
+from pydantic import BaseModel, Field, field_validator
+from typing import List, Optional
+
+from api.config.settings import settings
+
+
+def validar_campos(fields: Optional[List[str]]) -> Optional[List[str]]:
+    """projeção do payload: 'text', 'metadata' ou 'metadata.<campo>'"""
+    if fields is None:
+        return None
+    for field in fields:
+        if field not in ("text", "metadata") and not field.startswith("metadata."):
+            raise ValueError(f"Campo inválido: {field!r}. Use 'text', 'metadata' ou 'metadata.<campo>'.")
+    return sorted(set(fields))
+
+
+class SearchRequestError(ValueError):
+    """parâmetro inválido vindo do cliente (perfil desconhecido, filtros
+     incoerentes): as rotas respondem 400, outros erros seguem como 500"""
+
+
+class SearchFilters(BaseModel):
+    """filtros de metadados aplicados dentro da busca (em cada prefetch), não depois dela"""
+    ano_min: Optional[int] = None
+    ano_max: Optional[int] = None
+    tipo_conteudo: Optional[str] = None
+    # basta um dos autores aparecer
+    autores: Optional[List[str]] = None
+    document_ids: Optional[List[str]] = None
+
 
 class SearchRequest(BaseModel):
     """é o modelo que o usuario vai enviar para o endpoint de busca, ele contém o texto que o usuário quer buscar
      e o número de resultados que ele quer receber"""
     query: str
     limit: int = 3
+    # perfil de busca (fast, balanced, deep); None usa o padrão da configuração
+    profile: str | None = None
+    filters: Optional[SearchFilters] = None
+    # campos do payload a retornar, ex.: ["text"] ou ["text", "metadata.titulo"];
+    # None retorna o payload inteiro
+    fields: Optional[List[str]] = None
+
+    _validar_fields = field_validator("fields")(validar_campos)
+
 
 class SearchResult(BaseModel):
     """é o modelo que o endpoint de busca vai retornar para o usuário,
      ele contém o id do documento, a pontuação de relevância e o texto do documento"""
+    # id do chunk no Qdrant (ausente em respostas antigas do cache de busca)
+    id: Optional[str] = None
     score: float
-    text: str
-    metadata: dict
+    # ausentes quando a projeção (fields) não os inclui
+    text: Optional[str] = None
+    metadata: dict = {}
+
 
 class SearchResponse(BaseModel):
     """é o modelo que o endpoint de busca vai retornar para o usuário,
      ele contém uma lista de resultados de busca"""
-    results: List[SearchResult]
\ No newline at end of file
+    results: List[SearchResult]
+
+
+class GroupedSearchRequest(SearchRequest):
+    """busca agrupada por documento: limit é o número de documentos e
+     group_size o máximo de chunks por documento"""
+    group_size: int = Field(2, ge=1, le=10)
+
+
+class DocumentHits(BaseModel):
+    """um documento e os seus melhores chunks, em ordem de relevância"""
+    document_id: str
+    score: float
+    results: List[SearchResult]
+
+
+class GroupedSearchResponse(BaseModel):
+    groups: List[DocumentHits]
+
+
+class BatchSearchRequest(BaseModel):
+    """várias buscas em uma requisição (agentes, avaliação offline)"""
+    queries: List[SearchRequest] = Field(..., min_length=1, max_length=settings.search_batch_max_queries)
+
+
+class BatchSearchResponse(BaseModel):
+    """uma resposta por busca, na mesma ordem de queries"""
+    responses: List[SearchResponse]
@@ -1,10 +1,11 @@
-from fastapi import APIRouter, Depends
-from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import Literal, Optional
 from api.models.document_models import (
     DocumentListResponse,
     DocumentDetailResponse,
 )
 from api.services.document_service import DocumentService
+from api.services.metrics import json_response
 from api.dependencies import get_document_service
 
 router = APIRouter()
@@ -18,12 +19,27 @@ async def list_documents(
     author: Optional[str] = None,
     ano: Optional[int] = None,
     tipo: Optional[str] = None,
-    limit: int = 50,
+    titulo: Optional[str] = None,
+    document_id: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    sort: Literal["id", "ano", "titulo"] = "id",
+    order: Literal["asc", "desc"] = "asc",
     document_service: DocumentService = Depends(get_document_service),
 ):
-    return document_service.search_documents(
-        author=author,
-        ano=ano,
-        tipo=tipo,
-        limit=limit,
-    )
+    try:
+        response = await document_service.asearch_documents(
+            author=author,
+            ano=ano,
+            tipo=tipo,
+            titulo=titulo,
+            document_id=document_id,
+            limit=limit,
+            cursor=cursor,
+            sort=sort,
+            order=order,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+    return json_response(response)
@@ -0,0 +1,20 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+from api.lifespan import readiness
+
+router = APIRouter(prefix="/health", tags=["health"])
+
+
+@router.get("/live")
+async def live():
+    """O processo está de pé (não depende de modelos nem do Qdrant)."""
+    return {"status": "ok"}
+
+
+@router.get("/ready")
+async def ready():
+    """200 só depois do aquecimento; até lá 503, para o balanceador não enviar tráfego."""
+    return JSONResponse(
+        status_code=200 if readiness.ready else 503,
+        content=readiness.as_dict(),
+    )
@@ -0,0 +1,10 @@
+from fastapi import APIRouter
+from api.services.metrics import render_metrics
+
+router = APIRouter(tags=["metrics"])
+
+
+@router.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Métricas no formato texto do Prometheus (503 sem prometheus_client)."""
+    return render_metrics()
@@ -1,9 +1,16 @@
+import json
+import logging
+
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
 from api.models.rag_models import RAGResponse, RAGRequest
 from api.services.rag_service import RagService
-from api.services.search_service import SearchServiceError
+from api.services.search_service import SearchRequestError, SearchServiceError
+from api.services.metrics import json_response
 from api.dependencies import get_rag_service
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 
 @router.post("/rag", response_model=RAGResponse)
@@ -12,6 +19,75 @@ async def rag(
     rag_service: RagService = Depends(get_rag_service),
 ):
     try:
-        return rag_service.generate_answer(request.query, request.limit)
+        response = await rag_service.agenerate_answer(
+            request.query,
+            request.limit,
+            request.profile,
+            request.filters,
+            request.fields,
+        )
+    except SearchRequestError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
     except SearchServiceError as exc:
         raise HTTPException(status_code=500, detail=str(exc)) from exc
+
+    return json_response(response)
+
+
+@router.post("/rag/stream")
+async def rag_stream(
+    request: RAGRequest,
+    rag_service: RagService = Depends(get_rag_service),
+):
+    """
+    Mesmo fluxo do /rag em server-sent events: um evento `sources` com os
+    metadados assim que a busca termina, um `token` por trecho da resposta e
+    `done` com a resposta completa (ou `error` se o LLM falhar no meio).
+    """
+    events = rag_service.astream_answer(
+        request.query,
+        request.limit,
+        request.profile,
+        request.filters,
+        request.fields,
+    )
+    # a busca roda aqui, antes da resposta começar: erros dela ainda viram 400/500
+    started = False
+    try:
+        first = await anext(events)
+        started = True
+    except SearchRequestError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    except SearchServiceError as exc:
+        raise HTTPException(status_code=500, detail=str(exc)) from exc
+    finally:
+        if not started:
+            # o gerador não chega ao StreamingResponse: fecha aqui
+            await events.aclose()
+
+    return StreamingResponse(
+        _sse(first, events),
+        media_type="text/event-stream",
+        # sem cache nem buffer em proxies (nginx), para os tokens chegarem um a um
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def _sse_event(event: str, data) -> str:
+    # data em JSON: quebras de linha do texto não quebram o evento
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+async def _sse(first, events):
+    try:
+        yield _sse_event(*first)
+        async for event, data in events:
+            yield _sse_event(event, data)
+    except Exception as exc:
+        # o status 200 já foi enviado: o erro vai como evento
+        logger.exception("Falha no streaming do /rag")
+        yield _sse_event("error", {"detail": str(exc)})
+    finally:
+        # cliente que desconecta fecha este gerador; o de eventos fecha junto
+        # (e com ele o stream da OpenAI)
+        await events.aclose()
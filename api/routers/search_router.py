@@ -1,6 +1,14 @@
 from fastapi import APIRouter, Depends, HTTPException
-from api.models.search_models import SearchResponse, SearchRequest
-from api.services.search_service import SearchService, SearchServiceError
+from api.models.search_models import (
+    BatchSearchRequest,
+    BatchSearchResponse,
+    GroupedSearchRequest,
+    GroupedSearchResponse,
+    SearchRequest,
+    SearchResponse,
+)
+from api.services.search_service import SearchRequestError, SearchService, SearchServiceError
+from api.services.metrics import json_response
 from api.dependencies import get_search_service
 
 router = APIRouter()
@@ -11,6 +19,53 @@ async def search(
     search_service: SearchService = Depends(get_search_service),
 ):
     try:
-        return search_service.search(request.query, request.limit)
+        response = await search_service.asearch(
+            request.query,
+            request.limit,
+            request.profile,
+            request.filters,
+            request.fields,
+        )
+    except SearchRequestError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
     except SearchServiceError as exc:
         raise HTTPException(status_code=500, detail=str(exc)) from exc
+
+    return json_response(response, exclude_none=True)
+
+
+@router.post("/search/grouped", response_model=GroupedSearchResponse)
+async def search_grouped(
+    request: GroupedSearchRequest,
+    search_service: SearchService = Depends(get_search_service),
+):
+    try:
+        response = await search_service.asearch_grouped(
+            request.query,
+            request.limit,
+            request.group_size,
+            request.profile,
+            request.filters,
+            request.fields,
+        )
+    except SearchRequestError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    except SearchServiceError as exc:
+        raise HTTPException(status_code=500, detail=str(exc)) from exc
+
+    return json_response(response, exclude_none=True)
+
+
+@router.post("/search/batch", response_model=BatchSearchResponse)
+async def search_batch(
+    request: BatchSearchRequest,
+    search_service: SearchService = Depends(get_search_service),
+):
+    try:
+        response = BatchSearchResponse(responses=await search_service.asearch_many(request.queries))
+    except SearchRequestError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    except SearchServiceError as exc:
+        raise HTTPException(status_code=500, detail=str(exc)) from exc
+
+    return json_response(response, exclude_none=True)
@@ -0,0 +1,173 @@
+"""
+Cache semântico das respostas do RAG.
+
+Perguntas repetidas no /rag costumam ser paráfrases umas das outras ("efeitos
+do bolsa família na pobreza" / "qual o impacto do bolsa família sobre a
+pobreza"), e cada uma custa uma chamada ao LLM. O cache guarda, por resposta
+gerada, o vetor denso da pergunta, um hash do texto normalizado e os ids dos
+chunks usados como contexto. Uma pergunta nova reaproveita a resposta quando:
+
+- a busca dela recuperou exatamente os mesmos chunks, na mesma ordem
+  (mesmo contexto no prompt: fontes, filtros e perfil já estão cobertos), e
+- a similaridade de cosseno com a pergunta guardada é >= paraphrase_threshold
+  (0.99), ou é >= threshold e o texto normalizado (sem caixa, acentos e
+  pontuação) é o mesmo
+
+Só a similaridade não basta: com o e5-large, perguntas curtas sobre o mesmo
+documento ("quem são os autores do TD X" / "em que ano saiu o TD X") passam de
+0.95 e recuperam os mesmos chunks, mas pedem respostas diferentes. Por isso o
+cache vem desligado (RAG_CACHE_SIZE=0) e os limiares só devem baixar depois
+de medidos com pares de paráfrases e não paráfrases do próprio tráfego.
+
+A busca continua rodando sempre; o que se economiza é o LLM. As entradas
+pertencem a uma versão da coleção (shared.collection_version): uma ingestão
+nova descarta o cache inteiro.
+
+Os vetores ficam em uma matriz numpy pré-alocada, e a consulta é um produto
+matriz-vetor (1.000 entradas x 1.024 dimensões: ~4 MB e menos de 1 ms).
+Cada réplica tem o seu cache.
+"""
+import hashlib
+import re
+import threading
+import time
+import unicodedata
+from dataclasses import dataclass
+
+import numpy as np
+
+
+def question_key(query: str) -> str:
+    """Hash da pergunta sem caixa, acentos, pontuação e espaços repetidos."""
+    text = unicodedata.normalize("NFKD", query.casefold())
+    text = "".join(char for char in text if not unicodedata.combining(char))
+    text = " ".join(re.sub(r"[^\w\s]", " ", text).split())
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+@dataclass
+class CachedAnswer:
+    question: str
+    chunk_ids: tuple[str, ...]
+    answer: str
+    expires_at: float | None
+    last_used: float
+
+
+class SemanticAnswerCache:
+    def __init__(
+        self,
+        maxsize: int,
+        threshold: float = 0.95,
+        paraphrase_threshold: float = 0.99,
+        ttl: float | None = None,
+    ):
+        self.maxsize = maxsize
+        self.threshold = threshold
+        self.paraphrase_threshold = paraphrase_threshold
+        self.ttl = ttl
+        self.version: str | None = None
+        self._vectors: np.ndarray | None = None
+        self._entries: list[CachedAnswer | None] = []
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _normalize(vector) -> np.ndarray:
+        vector = np.asarray(vector, dtype=np.float32).ravel()
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+
+    def _check_version(self, version: str) -> None:
+        # chamado com o lock: versão nova da coleção invalida tudo
+        if version != self.version:
+            self.version = version
+            self._vectors = None
+            self._entries = []
+
+    def get(self, vector, query: str, chunk_ids: tuple[str, ...], version: str) -> str | None:
+        """Resposta de uma pergunta parecida com as mesmas fontes, ou None."""
+        vector = self._normalize(vector)
+        question = question_key(query)
+        now = time.monotonic()
+        with self._lock:
+            self._check_version(version)
+            if self._entries:
+                similarities = self._vectors[:len(self._entries)] @ vector
+                # da mais parecida para a menos, entre as que passam do limiar
+                candidates = np.flatnonzero(similarities >= self.threshold)
+                for i in candidates[np.argsort(-similarities[candidates])]:
+                    entry = self._entries[i]
+                    if entry is None or entry.chunk_ids != chunk_ids:
+                        continue
+                    if similarities[i] < self.paraphrase_threshold and entry.question != question:
+                        # parecida, mas não o bastante para ignorar o texto
+                        continue
+                    if entry.expires_at is not None and entry.expires_at <= now:
+                        self._entries[i] = None
+                        continue
+                    entry.last_used = now
+                    self.hits += 1
+                    return entry.answer
+            self.misses += 1
+            return None
+
+    def set(self, vector, query: str, chunk_ids: tuple[str, ...], version: str, answer: str) -> None:
+        vector = self._normalize(vector)
+        now = time.monotonic()
+        entry = CachedAnswer(
+            question=question_key(query),
+            chunk_ids=chunk_ids,
+            answer=answer,
+            expires_at=now + self.ttl if self.ttl else None,
+            last_used=now,
+        )
+        with self._lock:
+            self._check_version(version)
+            if self._vectors is None:
+                # alocada na primeira resposta: a dimensão vem do modelo denso
+                self._vectors = np.zeros((self.maxsize, vector.shape[0]), dtype=np.float32)
+
+            if len(self._entries) < self.maxsize:
+                slot = len(self._entries)
+                self._entries.append(entry)
+            else:
+                # cheio: reaproveita a posição vazia/expirada ou a menos usada
+                slot = min(
+                    range(len(self._entries)),
+                    key=lambda i: -1.0 if self._entries[i] is None else self._entries[i].last_used,
+                )
+                self._entries[slot] = entry
+            self._vectors[slot] = vector
+
+    def clear(self) -> None:
+        with self._lock:
+            self._vectors = None
+            self._entries = []
+
+    def __len__(self) -> int:
+        return sum(entry is not None for entry in self._entries)
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "size": len(self),
+            "maxsize": self.maxsize,
+            "threshold": self.threshold,
+            "paraphrase_threshold": self.paraphrase_threshold,
+        }
+
+
+def create_answer_cache(
+    size: int,
+    threshold: float,
+    paraphrase_threshold: float,
+    ttl: float | None,
+) -> SemanticAnswerCache | None:
+    if size <= 0:
+        return None
+    return SemanticAnswerCache(size, threshold, paraphrase_threshold, ttl)
@@ -0,0 +1,192 @@
+import base64
+import binascii
+import json
+import sqlite3
+import threading
+from pathlib import Path
+
+from api.models.document_models import DocumentDetail, DocumentDetailResponse
+from ingestao.db.banco_metadados import termo_fts
+
+STATUS_INDEXADO = "processado"
+
+# coluna de ordenação -> expressão; precisa bater com os índices
+# idx_documentos_catalogo_* criados por MetadataDB.criar_indices
+SORT_COLUMNS = {
+    "id": "d.id",
+    "ano": "COALESCE(d.ano, -1)",
+    "titulo": "COALESCE(d.titulo, '')",
+}
+
+
+def encode_cursor(sort: str, order: str, value, document_id: str) -> str:
+    payload = json.dumps([sort, order, value, document_id], ensure_ascii=False)
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: str, order: str) -> tuple:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        cursor_sort, cursor_order, value, document_id = json.loads(base64.urlsafe_b64decode(padded))
+    except (binascii.Error, ValueError, TypeError):
+        raise ValueError("Cursor inválido.") from None
+    # o cursor vem do cliente: só aceita o que encode_cursor produz (bool é int)
+    if (
+        isinstance(value, bool)
+        or not isinstance(value, (str, int, float, type(None)))
+        or not isinstance(document_id, str)
+    ):
+        raise ValueError("Cursor inválido.")
+    if (cursor_sort, cursor_order) != (sort, order):
+        raise ValueError("O cursor foi gerado com outra ordenação.")
+    return value, document_id
+
+
+class DocumentCatalog:
+    """
+    Catálogo de documentos lido direto do SQLite do MetadataDB (somente leitura).
+
+    Lista apenas documentos já indexados (status 'processado'), com paginação
+    por cursor (keyset): cada página custa O(tamanho da página) pelos índices
+    do banco, em vez de percorrer todos os chunks da coleção no Qdrant.
+    """
+
+    def __init__(self, db_path: Path | str):
+        self.db_path = Path(db_path)
+        if not self.db_path.exists():
+            raise FileNotFoundError(f"Banco de metadados não encontrado: {self.db_path}")
+        self._local = threading.local()
+
+    def conectar(self) -> sqlite3.Connection:
+        # uma conexão por thread; mode=ro garante que a API nunca escreve no banco
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(f"{self.db_path.as_uri()}?mode=ro", uri=True)
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _filtros(
+        author: str | None,
+        ano: int | None,
+        tipo: str | None,
+        titulo: str | None,
+        document_id: str | None,
+    ) -> tuple[list[str], list]:
+        condicoes = ["d.status_ingestao = ?"]
+        params: list = [STATUS_INDEXADO]
+
+        # autor e título usam o índice FTS do MetadataDB
+        expressoes = []
+        termo_autor = termo_fts(author)
+        if termo_autor:
+            expressoes.append(f"autores : {termo_autor}")
+        termo_titulo = termo_fts(titulo)
+        if termo_titulo:
+            expressoes.append(f"titulo : {termo_titulo}")
+        if expressoes:
+            condicoes.append("d.rowid IN (SELECT rowid FROM documentos_fts WHERE documentos_fts MATCH ?)")
+            params.append(" AND ".join(expressoes))
+
+        if ano is not None:
+            condicoes.append("d.ano = ?")
+            params.append(ano)
+        if tipo:
+            condicoes.append("d.tipo_conteudo LIKE ?")
+            params.append(f"%{tipo}%")
+        if document_id:
+            condicoes.append("d.id = ?")
+            params.append(document_id)
+
+        return condicoes, params
+
+    def contar(self, condicoes: list[str], params: list) -> int:
+        conn = self.conectar()
+        if len(condicoes) == 1:
+            # sem filtros: contagem materializada em documentos_resumo, O(1)
+            row = conn.execute(
+                """
+                SELECT total FROM documentos_resumo
+                WHERE dimensao = 'status_ingestao' AND valor = ?
+                """,
+                (STATUS_INDEXADO,),
+            ).fetchone()
+            return row["total"] if row else 0
+
+        row = conn.execute(
+            f"SELECT COUNT(*) AS total FROM documentos d WHERE {' AND '.join(condicoes)}",
+            params,
+        ).fetchone()
+        return row["total"]
+
+    def list_documents(
+        self,
+        author: str | None = None,
+        ano: int | None = None,
+        tipo: str | None = None,
+        titulo: str | None = None,
+        document_id: str | None = None,
+        limit: int = 50,
+        cursor: str | None = None,
+        sort: str = "id",
+        order: str = "asc",
+    ) -> DocumentDetailResponse:
+        if sort not in SORT_COLUMNS:
+            raise ValueError(f"Ordenação inválida: {sort!r}. Opções: {sorted(SORT_COLUMNS)}")
+        if order not in ("asc", "desc"):
+            raise ValueError(f"Direção inválida: {order!r}. Opções: ['asc', 'desc']")
+
+        condicoes, params = self._filtros(author, ano, tipo, titulo, document_id)
+        total = self.contar(condicoes, params)
+
+        coluna = SORT_COLUMNS[sort]
+        direcao = "ASC" if order == "asc" else "DESC"
+        ordenacao = f"{coluna} {direcao}" if sort == "id" else f"{coluna} {direcao}, d.id {direcao}"
+        pagina_condicoes, pagina_params = list(condicoes), list(params)
+        if cursor:
+            valor, ultimo_id = decode_cursor(cursor, sort, order)
+            comparacao = ">" if order == "asc" else "<"
+            if sort == "id":
+                pagina_condicoes.append(f"d.id {comparacao} ?")
+                pagina_params.append(ultimo_id)
+            else:
+                # equivale a (coluna, id) > (valor, ultimo_id), escrito de forma que
+                # o SQLite use o primeiro termo como faixa no índice
+                pagina_condicoes.append(f"{coluna} {comparacao}= ? AND ({coluna} {comparacao} ? OR d.id {comparacao} ?)")
+                pagina_params.extend([valor, valor, ultimo_id])
+
+        # uma linha a mais só para saber se existe próxima página
+        rows = self.conectar().execute(
+            f"""
+            SELECT d.id, d.titulo, d.autores, d.ano, d.tipo_conteudo,
+                   d.link_pdf, d.link_download, {coluna} AS chave
+            FROM documentos d
+            WHERE {' AND '.join(pagina_condicoes)}
+            ORDER BY {ordenacao}
+            LIMIT ?
+            """,
+            [*pagina_params, limit + 1],
+        ).fetchall()
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(sort, order, rows[-1]["chave"], rows[-1]["id"])
+
+        return DocumentDetailResponse(
+            documentos=[
+                DocumentDetail(
+                    document_id=row["id"],
+                    titulo=row["titulo"],
+                    autores=row["autores"],
+                    ano=row["ano"],
+                    tipo_conteudo=row["tipo_conteudo"],
+                    link=row["link_pdf"],
+                    link_download=row["link_download"],
+                )
+                for row in rows
+            ],
+            total=total,
+            next_cursor=next_cursor,
+        )
@@ -1,18 +1,36 @@
-from qdrant_client import QdrantClient, models
+import asyncio
+
+from qdrant_client import AsyncQdrantClient, QdrantClient, models
 from api.models.document_models import (
     DocumentBase,
     DocumentDetail,
     DocumentListResponse,
     DocumentDetailResponse,
 )
+from api.services.catalog import DocumentCatalog
+from shared.qdrant import QdrantConfig, get_async_qdrant_client, get_qdrant_client
 
 
 class DocumentService:
-    def __init__(self, qdrant_url: str, qdrant_api_key: str, collection_name: str):
-        self.qdrant = QdrantClient(url=qdrant_url, api_key=qdrant_api_key)
+    def __init__(
+            self,
+            qdrant_url: str,
+            qdrant_api_key: str,
+            collection_name: str,
+            catalog: DocumentCatalog | None = None,
+            qdrant: QdrantClient | None = None,
+            async_qdrant: AsyncQdrantClient | None = None,
+    ):
+        # clientes compartilhados (shared.qdrant): fechados no fim do lifespan, não aqui
+        config = QdrantConfig(url=qdrant_url, api_key=qdrant_api_key)
+        self.qdrant = qdrant or get_qdrant_client(config)
+        self.async_qdrant = async_qdrant or get_async_qdrant_client(config)
         self.collection_name = collection_name
+        # com o catálogo (SQLite do MetadataDB) a listagem é paginada por cursor;
+        # sem ele, cai no scroll da coleção de chunks
+        self.catalog = catalog
 
-    def list_documents(self) -> DocumentListResponse:
+    def list_documents(self, limit: int | None = None) -> DocumentListResponse:
         documentos_dict = {}
         offset = None
 
@@ -28,24 +46,55 @@ class DocumentService:
             if not points:
                 break
 
-            for point in points:
-                metadata = point.payload.get("metadata", {})
-                document_id = metadata.get("document_id")
+            self._collect_documents(points, documentos_dict)
 
-                if document_id and document_id not in documentos_dict:
-                    documentos_dict[document_id] = {
-                        "document_id": document_id,
-                        "titulo": metadata.get("titulo"),
-                        "autores": metadata.get("autores"),
-                    }
+            if offset is None or (limit is not None and len(documentos_dict) >= limit):
+                break
 
-            if offset is None:
+        return self._list_response(documentos_dict, limit)
+
+    async def alist_documents(self, limit: int | None = None) -> DocumentListResponse:
+        documentos_dict = {}
+        offset = None
+
+        while True:
+            points, offset = await self.async_qdrant.scroll(
+                collection_name=self.collection_name,
+                limit=1000,
+                with_payload=True,
+                with_vectors=False,
+                offset=offset,
+            )
+
+            if not points:
                 break
 
+            self._collect_documents(points, documentos_dict)
+
+            if offset is None or (limit is not None and len(documentos_dict) >= limit):
+                break
+
+        return self._list_response(documentos_dict, limit)
+
+    @staticmethod
+    def _collect_documents(points, documentos_dict: dict) -> None:
+        for point in points:
+            metadata = point.payload.get("metadata", {})
+            document_id = metadata.get("document_id")
+
+            if document_id and document_id not in documentos_dict:
+                documentos_dict[document_id] = {
+                    "document_id": document_id,
+                    "titulo": metadata.get("titulo"),
+                    "autores": metadata.get("autores"),
+                }
+
+    @staticmethod
+    def _list_response(documentos_dict: dict, limit: int | None = None) -> DocumentListResponse:
         return DocumentListResponse(
             documentos=[
                 DocumentBase(**doc)
-                for doc in documentos_dict.values()
+                for doc in list(documentos_dict.values())[:limit]
             ]
         )
 
@@ -57,12 +106,73 @@ class DocumentService:
             titulo: str | None = None,
             document_id: str | None = None,
             limit: int = 50,
+            cursor: str | None = None,
+            sort: str = "id",
+            order: str = "asc",
     ) -> DocumentDetailResponse | DocumentListResponse:
 
+        if self.catalog is not None:
+            return self.catalog.list_documents(
+                author, ano, tipo, titulo, document_id, limit, cursor, sort, order
+            )
+
         # Se não houver filtros → retorna lista simples
         if not any([author, ano, tipo, titulo, document_id]):
-            return self.list_documents()
+            return self.list_documents(limit)
 
+        scroll_filter = self._build_filter(author, ano, tipo, titulo, document_id)
+
+        points, _ = self.qdrant.scroll(
+            collection_name=self.collection_name,
+            scroll_filter=scroll_filter,
+            limit=limit,
+            with_payload=True,
+            with_vectors=False,
+        )
+
+        return self._detail_response(points)
+
+    async def asearch_documents(
+            self,
+            author: str | None = None,
+            ano: int | None = None,
+            tipo: str | None = None,
+            titulo: str | None = None,
+            document_id: str | None = None,
+            limit: int = 50,
+            cursor: str | None = None,
+            sort: str = "id",
+            order: str = "asc",
+    ) -> DocumentDetailResponse | DocumentListResponse:
+
+        if self.catalog is not None:
+            # consulta curta por índice; roda em thread para não segurar o event loop
+            return await asyncio.to_thread(
+                self.catalog.list_documents,
+                author, ano, tipo, titulo, document_id, limit, cursor, sort, order,
+            )
+
+        if not any([author, ano, tipo, titulo, document_id]):
+            return await self.alist_documents(limit)
+
+        points, _ = await self.async_qdrant.scroll(
+            collection_name=self.collection_name,
+            scroll_filter=self._build_filter(author, ano, tipo, titulo, document_id),
+            limit=limit,
+            with_payload=True,
+            with_vectors=False,
+        )
+
+        return self._detail_response(points)
+
+    @staticmethod
+    def _build_filter(
+            author: str | None,
+            ano: int | None,
+            tipo: str | None,
+            titulo: str | None,
+            document_id: str | None,
+    ) -> models.Filter:
         must_conditions = []
 
         # TEXT → MatchText
@@ -108,16 +218,10 @@ class DocumentService:
                 )
             )
 
-        scroll_filter = models.Filter(must=must_conditions)
-
-        points, _ = self.qdrant.scroll(
-            collection_name=self.collection_name,
-            scroll_filter=scroll_filter,
-            limit=limit,
-            with_payload=True,
-            with_vectors=False,
-        )
+        return models.Filter(must=must_conditions)
 
+    @staticmethod
+    def _detail_response(points) -> DocumentDetailResponse:
         documentos = {}
 
         for p in points:
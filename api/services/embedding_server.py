@@ -0,0 +1,277 @@
+"""
+Servidor de embeddings local, compartilhado pelos workers da API.
+
+Cada worker do uvicorn carregaria a sua cópia dos três modelos (vários GB).
+Com o servidor, um único processo por máquina carrega os modelos e atende os
+workers por um socket Unix (multiprocessing.connection).
+As consultas de todas as conexões passam pelo mesmo QueryBatcher, então
+requisições concorrentes de workers diferentes viram uma inferência por modelo.
+
+    EMBEDDING_SERVER_AUTHKEY=... python -m api.services.embedding_server --socket /run/ipea/embeddings.sock
+
+Na API, EMBEDDING_SERVER_SOCKET com o mesmo caminho troca o EmbeddingsService
+local pelo RemoteEmbeddingsService (mesma interface).
+
+As mensagens trafegam em pickle: quem conecta ao socket executa código como o
+usuário do servidor. Por isso a authkey (EMBEDDING_SERVER_AUTHKEY, a mesma nos
+dois lados) é obrigatória, e o socket nasce com permissão 0600 em um
+diretório 0700 (criado se não existir), sem janela em que outro usuário
+consiga conectar.
+"""
+import argparse
+import logging
+import os
+import queue
+import stat
+import threading
+from multiprocessing.connection import Client, Connection, Listener
+from typing import Any
+
+from api.services.embeddings import EMBEDDING_KINDS, EmbeddingsService
+from api.services.query_batcher import QueryBatcher
+
+
+logger = logging.getLogger(__name__)
+
+FAMILY = "AF_UNIX"
+
+
+class EmbeddingServerError(RuntimeError):
+    pass
+
+
+def _authkey(authkey: str | bytes | None) -> bytes:
+    if isinstance(authkey, str):
+        authkey = authkey.encode("utf-8")
+    if not authkey:
+        raise EmbeddingServerError(
+            "EMBEDDING_SERVER_AUTHKEY e obrigatoria (gere uma com: "
+            "python -c 'import secrets; print(secrets.token_hex(32))')"
+        )
+    return authkey
+
+
+def _private_dir(address: str) -> None:
+    """Garante que o diretório do socket existe e só o dono o acessa."""
+    directory = os.path.dirname(os.path.abspath(address))
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    info = os.stat(directory)
+    if info.st_uid != os.getuid() or stat.S_IMODE(info.st_mode) & 0o077:
+        raise EmbeddingServerError(
+            f"O diretorio do socket ({directory}) precisa ser do usuario do servidor e ter permissao 0700"
+        )
+
+
+class EmbeddingServer:
+    """
+    Protocolo: cada mensagem é uma tupla (operação, argumento) e a resposta é
+    ("ok", resultado) ou ("erro", mensagem).
+
+    - ("embed", [(consulta, modelos), ...]) -> [(denso, esparso, colbert), ...]
+    - ("stats", None) -> estatísticas do cache e do batcher
+    - ("ping", None) -> None
+    """
+
+    def __init__(
+        self,
+        address: str,
+        authkey: str | bytes | None,
+        window_ms: float = 5.0,
+        max_batch: int = 32,
+        embeddings_service: EmbeddingsService | None = None,
+    ):
+        self.address = address
+        self.authkey = _authkey(authkey)
+        self.embeddings_service = embeddings_service or EmbeddingsService()
+        self.batcher = QueryBatcher(self.embeddings_service.embed_batch, window_ms=window_ms, max_batch=max_batch)
+        self.listener: Listener | None = None
+        self._closed = False
+
+    def serve_forever(self) -> None:
+        _private_dir(self.address)
+        if os.path.exists(self.address):
+            # socket de uma execução anterior que não foi encerrada
+            os.unlink(self.address)
+        # o bind já cria o socket com 0600: chmod depois deixaria uma janela aberta
+        umask = os.umask(0o077)
+        try:
+            self.listener = Listener(self.address, family=FAMILY, authkey=self.authkey)
+        finally:
+            os.umask(umask)
+        logger.info("Servidor de embeddings ouvindo em %s", self.address)
+
+        try:
+            while True:
+                try:
+                    conn = self.listener.accept()
+                except Exception:
+                    if self.listener is None:
+                        # fechado por close()
+                        break
+                    # authkey errada ou cliente que desistiu no handshake
+                    logger.warning("Conexao recusada", exc_info=True)
+                    continue
+                threading.Thread(target=self._serve, args=(conn,), daemon=True).start()
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        self._closed = True
+        if self.listener is not None:
+            self.listener.close()
+            self.listener = None
+        self.batcher.close()
+        self.embeddings_service.close()
+
+    def _serve(self, conn: Connection) -> None:
+        with conn:
+            while True:
+                try:
+                    op, arg = conn.recv()
+                except (EOFError, OSError):
+                    return
+                if self._closed:
+                    # o cliente recebe EOF e reconecta ao próximo servidor
+                    return
+                try:
+                    conn.send(("ok", self._handle(op, arg)))
+                except (EOFError, OSError):
+                    return
+                except Exception as exc:
+                    logger.exception("Falha ao atender %r", op)
+                    conn.send(("erro", f"{type(exc).__name__}: {exc}"))
+
+    def _handle(self, op: str, arg: Any) -> Any:
+        if op == "embed":
+            # cada consulta entra no batcher separadamente: junta-se às de
+            # outras conexões que chegarem na mesma janela
+            futures = [self.batcher.submit((query, tuple(kinds))) for query, kinds in arg]
+            return [future.result() for future in futures]
+        if op == "stats":
+            return {"cache": self.embeddings_service.cache_stats(), "batcher": self.batcher.stats()}
+        if op == "ping":
+            return None
+        raise ValueError(f"Operacao desconhecida: {op!r}")
+
+
+class RemoteEmbeddingsService:
+    """
+    Cliente do EmbeddingServer com a interface do EmbeddingsService.
+
+    Mantém um pool de conexões (uma por chamada simultânea) e refaz a conexão
+    uma vez se o servidor tiver sido reiniciado. O cache de embeddings fica
+    no servidor, compartilhado por todos os workers.
+    """
+
+    normalize_query = staticmethod(EmbeddingsService.normalize_query)
+
+    def __init__(self, address: str, authkey: str | bytes | None, timeout: float = 30.0):
+        self.address = address
+        self.authkey = _authkey(authkey)
+        self.timeout = timeout
+        self._idle: queue.SimpleQueue[Connection] = queue.SimpleQueue()
+
+    def _connect(self) -> Connection:
+        return Client(self.address, family=FAMILY, authkey=self.authkey)
+
+    def _call_once(self, conn: Connection, op: str, arg: Any) -> Any:
+        conn.send((op, arg))
+        if not conn.poll(self.timeout):
+            raise EmbeddingServerError(f"Servidor de embeddings sem resposta em {self.timeout}s")
+        return conn.recv()
+
+    def _call(self, op: str, arg: Any = None) -> Any:
+        try:
+            conn = self._idle.get_nowait()
+            reused = True
+        except queue.Empty:
+            conn = self._connect()
+            reused = False
+
+        try:
+            status, result = self._call_once(conn, op, arg)
+        except (EOFError, OSError) as exc:
+            conn.close()
+            if not reused:
+                raise EmbeddingServerError(f"Falha na conexao com o servidor de embeddings: {exc}") from exc
+            # conexão ociosa de um servidor que reiniciou: tenta de novo com uma nova
+            conn = self._connect()
+            try:
+                status, result = self._call_once(conn, op, arg)
+            except Exception:
+                conn.close()
+                raise
+        except Exception:
+            # resposta pendente (timeout) ou quebrada: a conexão não volta ao pool
+            conn.close()
+            raise
+
+        self._idle.put(conn)
+        if status != "ok":
+            raise EmbeddingServerError(result)
+        return result
+
+    def embed_batch(self, items: list[tuple[str, tuple[str, ...]]]) -> list[tuple]:
+        return self._call("embed", [(query, tuple(kinds)) for query, kinds in items])
+
+    def embed_queries(self, queries: list[str], kinds: tuple[str, ...] = EMBEDDING_KINDS) -> list[tuple]:
+        return self.embed_batch([(query, kinds) for query in queries])
+
+    def embed_query(self, query, kinds: tuple[str, ...] = EMBEDDING_KINDS) -> tuple:
+        return self.embed_queries([query], kinds)[0]
+
+    def warmup(self) -> None:
+        """Só confirma que o servidor responde; os modelos já são aquecidos nele."""
+        self._call("ping")
+
+    def cache_stats(self) -> dict:
+        return self._call("stats")["cache"]
+
+    def close(self) -> None:
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+def main():
+    from api.config.settings import settings
+
+    parser = argparse.ArgumentParser(description="Servidor de embeddings compartilhado pelos workers da API")
+    parser.add_argument("--socket", default=settings.embedding_server_socket, required=not settings.embedding_server_socket)
+    parser.add_argument("--janela-ms", type=float, default=settings.embedding_server_window_ms)
+    parser.add_argument("--max-lote", type=int, default=settings.embedding_batch_max_size)
+    parser.add_argument("--metricas-porta", type=int, default=None, help="expõe /metrics do Prometheus nesta porta")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    server = EmbeddingServer(
+        args.socket,
+        authkey=settings.embedding_server_authkey,
+        window_ms=args.janela_ms,
+        max_batch=args.max_lote,
+    )
+    server.embeddings_service.warmup()
+
+    if args.metricas_porta:
+        # inferência por modelo e acertos do cache acontecem aqui, não nos workers
+        from api.services.metrics import prometheus_client
+
+        if prometheus_client is None:
+            logger.warning("prometheus_client nao instalado; --metricas-porta ignorado")
+        else:
+            prometheus_client.start_http_server(args.metricas_porta)
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if os.path.exists(args.socket):
+            os.unlink(args.socket)
+
+
+if __name__ == "__main__":
+    main()
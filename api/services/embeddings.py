@@ -1,17 +1,172 @@
-from fastembed import TextEmbedding, SparseTextEmbedding, LateInteractionTextEmbedding
+import unicodedata
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from qdrant_client import models
+
 from api.config.settings import settings
+from api.services.cache import LRUCache
+from api.services.metrics import in_context, record_cache, stage
+from shared.model_registry import model_registry
+
+
+EMBEDDING_KINDS = ("dense", "sparse", "colbert")
+
+
+def _frozen(array: np.ndarray, dtype) -> np.ndarray:
+    """Cópia compacta e somente leitura, segura para compartilhar via cache."""
+    array = np.ascontiguousarray(array, dtype=dtype)
+    array.setflags(write=False)
+    return array
+
 
 class EmbeddingsService:
-    def __init__(self):
-        self.dense_model = TextEmbedding(settings.dense_model)
-        self.sparse_model = SparseTextEmbedding(settings.sparse_model)
-        self.colbert_model = LateInteractionTextEmbedding(settings.colbert_model)
+    def __init__(
+        self,
+        executor: ThreadPoolExecutor | None = None,
+        dense_model=None,
+        sparse_model=None,
+        colbert_model=None,
+    ):
+        # modelos vêm do registro do processo: outras instâncias (e o chunker,
+        # quando rodando no mesmo processo) reaproveitam a mesma cópia. Modelos
+        # injetados (ex.: os falsos de api/benchmark) seguem as mesmas interfaces:
+        # DenseEncoder.embed_queries e query_embed do fastembed
+        if dense_model is None:
+            model_registry.set_backend(settings.embedding_backend)
+        self.dense_model = dense_model or model_registry.dense(settings.dense_model)
+        self.sparse_model = sparse_model or model_registry.sparse(settings.sparse_model)
+        self.colbert_model = colbert_model or model_registry.colbert(settings.colbert_model)
+
+        # o fingerprint entra na chave: trocar de modelo/backend invalida o cache
+        self.fingerprints = {
+            "dense": f"{model_registry.backend}:{settings.dense_model}",
+            "sparse": f"fastembed:{settings.sparse_model}",
+            "colbert": f"fastembed:{settings.colbert_model}",
+        }
+        self.cache = (
+            LRUCache(settings.embedding_cache_size, settings.embedding_cache_ttl)
+            if settings.embedding_cache_size > 0
+            else None
+        )
+        # o ONNX Runtime libera o GIL: sparse e ColBERT rodam neste pool enquanto
+        # a thread chamadora calcula o denso
+        self._owns_executor = executor is None
+        self.executor = executor or ThreadPoolExecutor(
+            max_workers=settings.embedding_encoder_workers,
+            thread_name_prefix="encoders",
+        )
+
+    @staticmethod
+    def normalize_query(query: str) -> str:
+        """Normaliza a consulta para a chave do cache (NFC e espaços colapsados)."""
+        return unicodedata.normalize("NFC", " ".join(query.split()))
+
+    def _dense(self, queries: list[str]) -> list[np.ndarray]:
+        return [_frozen(vector, np.float32) for vector in self.dense_model.embed_queries(queries)]
+
+    def _sparse(self, queries: list[str]) -> list[models.SparseVector]:
+        # já no formato do Qdrant: convertido uma vez e reaproveitado pelo cache;
+        # o SparseVector só aceita listas (arrays seriam validados item a item)
+        return [
+            models.SparseVector(indices=embedding.indices.tolist(), values=embedding.values.tolist())
+            for embedding in self.sparse_model.query_embed(queries)
+        ]
+
+    def _colbert(self, queries: list[str]) -> list[np.ndarray]:
+        return [_frozen(matrix, np.float32) for matrix in self.colbert_model.query_embed(queries)]
+
+    def _cached(self, kind: str, queries: list[str], compute) -> list:
+        """
+        Resolve um lote de consultas já normalizadas: o que está no cache sai
+        dele, o restante (sem repetições) vai em uma única chamada ao modelo.
+        """
+        found = {}
+        if self.cache is not None:
+            for query in queries:
+                value = self.cache.get((self.fingerprints[kind], query))
+                record_cache(f"embedding_{kind}", value is not None)
+                if value is not None:
+                    found[query] = value
+
+        missing = list(dict.fromkeys(q for q in queries if q not in found))
+        if missing:
+            # só a inferência do modelo: acertos do cache não entram no histograma
+            with stage(f"embedding_{kind}"):
+                computed = compute(missing)
+            for query, value in zip(missing, computed):
+                found[query] = value
+                if self.cache is not None:
+                    self.cache.set((self.fingerprints[kind], query), value)
+
+        return [found[query] for query in queries]
+
+    def embed_queries(
+        self,
+        queries: list[str],
+        kinds: tuple[str, ...] = EMBEDDING_KINDS,
+    ) -> list[tuple[np.ndarray, models.SparseVector | None, np.ndarray | None]]:
+        """
+        Versão em lote de embed_query: uma inferência por modelo para todas as
+        consultas, com os modelos rodando em paralelo. Modelos fora de `kinds`
+        não rodam e vêm como None (ex.: perfil fast sem ColBERT).
+        """
+        queries = [self.normalize_query(query) for query in queries]
+        none = [None] * len(queries)
+
+        sparse = (
+            self.executor.submit(in_context(self._cached, "sparse", queries, self._sparse))
+            if "sparse" in kinds else None
+        )
+        colbert = (
+            self.executor.submit(in_context(self._cached, "colbert", queries, self._colbert))
+            if "colbert" in kinds else None
+        )
+        dense = self._cached("dense", queries, self._dense)
+
+        return list(zip(
+            dense,
+            sparse.result() if sparse is not None else none,
+            colbert.result() if colbert is not None else none,
+        ))
+
+    def embed_query(
+        self,
+        query,
+        kinds: tuple[str, ...] = EMBEDDING_KINDS,
+    ) -> tuple[np.ndarray, models.SparseVector | None, np.ndarray | None]:
+        """
+        ela processa e retorna (denso, esparso, colbert) nos formatos aceitos
+        pelo query_points: arrays numpy somente leitura e models.SparseVector
+        """
+        return self.embed_queries([query], kinds)[0]
+
+    def embed_batch(self, items: list[tuple[str, tuple[str, ...]]]) -> list[tuple]:
+        """
+        Lote com modelos diferentes por consulta (perfis diferentes): agrupa as
+        consultas pelos modelos pedidos e faz um embed_queries por grupo.
+        """
+        groups: dict[tuple[str, ...], list[int]] = {}
+        for i, (_, kinds) in enumerate(items):
+            groups.setdefault(tuple(kinds), []).append(i)
+
+        results = [None] * len(items)
+        for kinds, positions in groups.items():
+            vectors = self.embed_queries([items[i][0] for i in positions], kinds)
+            for i, value in zip(positions, vectors):
+                results[i] = value
+        return results
 
-    def embed_query(self, query):
-        """ela processa e retorna"""
-        dense = list(self.dense_model.query_embed([query]))[0].tolist()
-        sparse = list(self.sparse_model.query_embed([query]))[0].as_object()
-        colbert = list(self.colbert_model.query_embed([query]))[0].tolist()
+    def warmup(self, queries: list[str] = ("aquecimento dos modelos",)) -> None:
+        """Inferência de aquecimento em cada modelo, sem passar pelo cache."""
+        queries = list(queries)
+        self._dense(queries)
+        self._sparse(queries)
+        self._colbert(queries)
 
-        return dense, sparse, colbert
+    def close(self) -> None:
+        if self._owns_executor:
+            self.executor.shutdown(wait=False, cancel_futures=True)
 
+    def cache_stats(self) -> dict:
+        return self.cache.stats() if self.cache is not None else {}
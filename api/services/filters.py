@@ -0,0 +1,62 @@
+from qdrant_client import models
+from api.models.search_models import SearchFilters, SearchRequestError
+
+
+def build_filter(filters: SearchFilters | None) -> models.Filter | None:
+    """
+    Converte os filtros da requisição em um Filter do Qdrant.
+
+    Cada condição usa o índice de payload criado em ingestao/create_collection.py:
+    ano é INTEGER (Range), tipo_conteudo e autores são TEXT (MatchText) e
+    document_id é KEYWORD (MatchAny).
+
+    Filtros incoerentes (ano_min maior que ano_max) levantam SearchRequestError.
+    """
+    if filters is None:
+        return None
+
+    must = []
+
+    if filters.ano_min is not None and filters.ano_max is not None and filters.ano_min > filters.ano_max:
+        raise SearchRequestError(
+            f"Filtro de ano inválido: ano_min ({filters.ano_min}) maior que ano_max ({filters.ano_max})."
+        )
+
+    if filters.ano_min is not None or filters.ano_max is not None:
+        must.append(
+            models.FieldCondition(
+                key="metadata.ano",
+                range=models.Range(gte=filters.ano_min, lte=filters.ano_max),
+            )
+        )
+
+    if filters.tipo_conteudo:
+        must.append(
+            models.FieldCondition(
+                key="metadata.tipo_conteudo",
+                match=models.MatchText(text=filters.tipo_conteudo),
+            )
+        )
+
+    if filters.autores:
+        must.append(
+            models.Filter(
+                should=[
+                    models.FieldCondition(
+                        key="metadata.autores",
+                        match=models.MatchText(text=autor),
+                    )
+                    for autor in filters.autores
+                ]
+            )
+        )
+
+    if filters.document_ids:
+        must.append(
+            models.FieldCondition(
+                key="metadata.document_id",
+                match=models.MatchAny(any=filters.document_ids),
+            )
+        )
+
+    return models.Filter(must=must) if must else None
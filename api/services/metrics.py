@@ -0,0 +1,181 @@
+"""
+Métricas de latência da API no formato do Prometheus.
+
+Cada etapa de uma requisição (embedding por modelo, consulta ao Qdrant,
+chamada ao LLM, serialização) é medida com `stage`, que alimenta o histograma
+ipea_api_stage_seconds e, dentro de uma requisição, o dicionário de tempos
+devolvido no cabeçalho Server-Timing quando o cliente envia `X-Server-Timing`.
+
+prometheus_client é opcional: sem ele as métricas viram no-op, o
+Server-Timing continua funcionando e /metrics responde 503.
+"""
+import functools
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar, copy_context
+
+from pydantic import BaseModel
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import Response
+
+REQUEST_TIMING_HEADER = "x-server-timing"
+
+
+class _SemMetrica:
+    """Substituto das métricas quando prometheus_client não está instalado."""
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def labels(self, *args, **kwargs):
+        return self
+
+    def observe(self, value: float) -> None:
+        pass
+
+    def inc(self, amount: float = 1) -> None:
+        pass
+
+    def dec(self, amount: float = 1) -> None:
+        pass
+
+
+try:
+    import prometheus_client
+    from prometheus_client import Counter, Gauge, Histogram
+except ImportError:
+    prometheus_client = None
+    Counter = Gauge = Histogram = _SemMetrica
+
+
+# de 1 ms (cache, Qdrant local) a 1 min (LLM)
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+STAGE_SECONDS = Histogram(
+    "ipea_api_stage_seconds",
+    "Duracao de cada etapa do atendimento (embedding por modelo, qdrant, llm, serializacao)",
+    ["stage"],
+    buckets=BUCKETS,
+)
+REQUEST_SECONDS = Histogram(
+    "ipea_api_request_seconds",
+    "Duracao total das requisicoes HTTP",
+    ["method", "route", "status"],
+    buckets=BUCKETS,
+)
+CACHE_REQUESTS = Counter(
+    "ipea_api_cache_requests_total",
+    "Consultas aos caches (busca e embeddings por modelo), por resultado",
+    ["cache", "result"],
+)
+IN_FLIGHT = Gauge(
+    "ipea_api_requests_in_flight",
+    "Requisicoes HTTP em andamento",
+)
+
+# tempos da requisição atual (etapa -> segundos); None fora de uma requisição
+_timings: ContextVar[dict[str, float] | None] = ContextVar("ipea_api_timings", default=None)
+# etapas medidas em threads do executor escrevem no mesmo dicionário
+_timings_lock = threading.Lock()
+
+
+@contextmanager
+def stage(name: str):
+    """
+    Mede o bloco como a etapa `name`. Etapas repetidas na mesma requisição
+    (ex.: várias chamadas ao Qdrant na busca em lote) somam no Server-Timing.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        STAGE_SECONDS.labels(name).observe(elapsed)
+        timings = _timings.get()
+        if timings is not None:
+            with _timings_lock:
+                timings[name] = timings.get(name, 0.0) + elapsed
+
+
+def in_context(func, *args, **kwargs):
+    """
+    Prende a chamada ao contexto atual para rodar em outra thread
+    (run_in_executor e executor.submit não copiam o contexto): as etapas
+    medidas lá entram no Server-Timing da requisição. Uma cópia por chamada,
+    pois um mesmo contexto não pode estar ativo em duas threads.
+    """
+    return functools.partial(copy_context().run, func, *args, **kwargs)
+
+
+def record_cache(cache: str, hit: bool) -> None:
+    CACHE_REQUESTS.labels(cache, "hit" if hit else "miss").inc()
+
+
+def json_response(model: BaseModel, exclude_none: bool = False) -> Response:
+    """
+    Serializa a resposta pelo núcleo do pydantic dentro da etapa
+    "serializacao": o mesmo caminho rápido (dump_json) que o FastAPI usa com
+    response_model, mas medido.
+    """
+    with stage("serializacao"):
+        body = model.model_dump_json(exclude_none=exclude_none)
+    return Response(body, media_type="application/json")
+
+
+def server_timing(timings: dict[str, float], total: float) -> str:
+    """Valor do cabeçalho Server-Timing, com as durações em milissegundos."""
+    entries = [f"{name};dur={seconds * 1000:.1f}" for name, seconds in timings.items()]
+    entries.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(entries)
+
+
+def render_metrics() -> Response:
+    if prometheus_client is None:
+        return Response("prometheus_client nao instalado\n", status_code=503, media_type="text/plain")
+    return Response(prometheus_client.generate_latest(), media_type=prometheus_client.CONTENT_TYPE_LATEST)
+
+
+class MetricsMiddleware:
+    """
+    Middleware ASGI: conta requisições em andamento, mede a duração total por
+    rota e abre o dicionário de tempos lido pelas etapas. O Server-Timing só
+    é enviado quando a requisição traz o cabeçalho `X-Server-Timing`.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings: dict[str, float] = {}
+        token = _timings.set(timings)
+        send_timing = REQUEST_TIMING_HEADER in Headers(scope=scope)
+        status = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if send_timing:
+                    headers = MutableHeaders(scope=message)
+                    headers.append("Server-Timing", server_timing(timings, time.perf_counter() - start))
+            await send(message)
+
+        IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            IN_FLIGHT.dec()
+            _timings.reset(token)
+            # o template da rota (ex.: /search), não o caminho bruto: cardinalidade limitada
+            route = scope.get("route")
+            REQUEST_SECONDS.labels(
+                scope["method"],
+                getattr(route, "path", "desconhecida"),
+                str(status),
+            ).observe(time.perf_counter() - start)
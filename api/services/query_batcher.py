@@ -0,0 +1,124 @@
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Sequence
+
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class QueryBatcher:
+    """
+    Agrupa consultas concorrentes em um único lote de inferência.
+
+    Cada submit devolve um Future; uma thread dedicada espera a primeira
+    consulta, junta as que chegarem em até `window_ms` (ou até `max_batch`)
+    e chama `fn` uma vez com o lote. Rotas assíncronas aguardam o Future com
+    asyncio.wrap_future, sem ocupar o event loop.
+    """
+
+    def __init__(
+        self,
+        fn: Callable[[list[Any]], Sequence[Any]],
+        window_ms: float = 5.0,
+        max_batch: int = 32,
+    ):
+        self.fn = fn
+        self.window = window_ms / 1000
+        self.max_batch = max_batch
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self.batches = 0
+        self.queries = 0
+        # _closed e o _STOP mudam juntos: nada entra na fila depois do _STOP
+        self._closed = False
+        self._closed_lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="query-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, query: Any) -> Future:
+        """`query` é repassado como está para `fn` (texto ou texto + opções)."""
+        future: Future = Future()
+        with self._closed_lock:
+            if self._closed:
+                raise RuntimeError("QueryBatcher encerrado")
+            self._queue.put((query, future))
+        return future
+
+    def close(self, timeout: float | None = None) -> None:
+        with self._closed_lock:
+            if not self._closed:
+                self._closed = True
+                self._queue.put(_STOP)
+        self._thread.join(timeout)
+
+    def _collect(self, first) -> tuple[list, bool]:
+        batch = [first]
+        deadline = time.monotonic() + self.window
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is _STOP:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _run(self) -> None:
+        try:
+            while True:
+                first = self._queue.get()
+                if first is _STOP:
+                    return
+
+                batch, stop = self._collect(first)
+                # requisições canceladas enquanto esperavam saem do lote
+                batch = [(query, future) for query, future in batch if future.set_running_or_notify_cancel()]
+                if batch:
+                    self._process(batch)
+                if stop:
+                    return
+        finally:
+            self._drain()
+
+    def _drain(self) -> None:
+        # o que ficou na fila depois do _STOP não vai ser processado: falha
+        # o Future em vez de deixar quem espera pendurado
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            if item is _STOP:
+                continue
+            _, future = item
+            if future.set_running_or_notify_cancel():
+                future.set_exception(RuntimeError("QueryBatcher encerrado"))
+
+    def _process(self, batch: list) -> None:
+        self.batches += 1
+        self.queries += len(batch)
+        try:
+            results = self.fn([query for query, _ in batch])
+        except Exception as exc:
+            logger.exception("Falha no lote de %d consultas", len(batch))
+            for _, future in batch:
+                future.set_exception(exc)
+            return
+
+        for (_, future), result in zip(batch, results):
+            future.set_result(result)
+
+    def stats(self) -> dict:
+        return {
+            "batches": self.batches,
+            "queries": self.queries,
+            "media_por_lote": self.queries / self.batches if self.batches else 0.0,
+        }
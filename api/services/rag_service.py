@@ -1,38 +1,237 @@
-from openai import OpenAI
+import time
+from typing import Any, AsyncIterator
+
+from openai import AsyncOpenAI, OpenAI
 from api.config.settings import settings
 from api.config.prompts import RAG_PROMPT
 from api.models.rag_models import RAGResponse
+from api.models.search_models import SearchFilters, SearchResponse
+from api.services.answer_cache import SemanticAnswerCache
+from api.services.metrics import STAGE_SECONDS, record_cache, stage
 from api.services.search_service import SearchService
 
+# campos doc.* lidos pelo frontend/app.js nas fontes da resposta (dedupeDocuments,
+# createDocumentCard, buildDocumentMeta, buildDocumentLink; o score vem da busca).
+# Ao exibir um campo novo no frontend, acrescente-o aqui
+FRONTEND_METADATA = (
+    "document_id",
+    "titulo",
+    "autores",
+    "ano",
+    "tipo_conteudo",
+    "link_pdf",
+    "link_download",
+)
+
+# metadados devolvidos por padrão no /rag e no /rag/stream: os que o frontend
+# exibe; o texto do chunk é sempre lido, pois vira o contexto do prompt
+RAG_FIELDS = [f"metadata.{campo}" for campo in FRONTEND_METADATA]
+
 class RagService:
-    def __init__(self, search_service: SearchService):
+    def __init__(
+        self,
+        search_service: SearchService,
+        openai: OpenAI | None = None,
+        async_openai: AsyncOpenAI | None = None,
+        answer_cache: SemanticAnswerCache | None = None,
+    ):
         self.search_service = search_service
-        self.openai = OpenAI(api_key=settings.openai_api_key)
+        # respostas de perguntas parecidas com as mesmas fontes (ver answer_cache.py)
+        self.answer_cache = answer_cache
+        self.openai = openai or OpenAI(api_key=settings.openai_api_key)
+        self.async_openai = async_openai or AsyncOpenAI(api_key=settings.openai_api_key)
+
+    def generate_answer(
+        self,
+        query: str,
+        limit: int=3,
+        profile: str | None = None,
+        filters: SearchFilters | None = None,
+        fields: list[str] | None = None,
+    ):
+        search_result = self.search_service.search(
+            query, limit=limit, profile=profile, filters=filters, fields=self._fields(fields)
+        )
+
+        cache_key = self._answer_key(query, search_result)
+        if cache_key is not None:
+            answer = self._cached_answer(cache_key)
+            if answer is not None:
+                return self._build_response(query, search_result, answer)
+
+        # chama o modelo de linguagem para gerar a resposta
+        with stage("llm"):
+            response = self.openai.chat.completions.create(**self._completion_kwargs(query, search_result))
+        answer = response.choices[0].message.content
+
+        if cache_key is not None and answer:
+            self.answer_cache.set(*cache_key, answer)
+        return self._build_response(query, search_result, answer)
+
+    async def agenerate_answer(
+        self,
+        query: str,
+        limit: int=3,
+        profile: str | None = None,
+        filters: SearchFilters | None = None,
+        fields: list[str] | None = None,
+    ):
+        """Mesmo fluxo de generate_answer, com busca e chamada ao modelo assíncronas."""
+        search_result = await self.search_service.asearch(
+            query, limit=limit, profile=profile, filters=filters, fields=self._fields(fields)
+        )
+
+        cache_key = await self._aanswer_key(query, search_result)
+        if cache_key is not None:
+            answer = self._cached_answer(cache_key)
+            if answer is not None:
+                return self._build_response(query, search_result, answer)
+
+        with stage("llm"):
+            response = await self.async_openai.chat.completions.create(
+                **self._completion_kwargs(query, search_result)
+            )
+        answer = response.choices[0].message.content
+
+        if cache_key is not None and answer:
+            self.answer_cache.set(*cache_key, answer)
+        return self._build_response(query, search_result, answer)
+
+    async def astream_answer(
+        self,
+        query: str,
+        limit: int=3,
+        profile: str | None = None,
+        filters: SearchFilters | None = None,
+        fields: list[str] | None = None,
+    ) -> AsyncIterator[tuple[str, Any]]:
+        """
+        Versão em streaming de agenerate_answer. Produz eventos (nome, dados):
+
+        - ("sources", {"query", "metadata"}) logo após a busca, antes do LLM
+        - ("token", texto) para cada trecho da resposta, na ordem em que chega
+          (um único token com a resposta inteira quando ela vem do cache)
+        - ("done", {"answer"}) com a resposta completa
 
-    def generate_answer(self, query: str, limit: int=3):
-        search_result = self.search_service.search(query, limit=limit)
+        Erros da busca (SearchRequestError, SearchServiceError) saem no primeiro
+        __anext__, antes de qualquer evento.
+        """
+        search_result = await self.search_service.asearch(
+            query, limit=limit, profile=profile, filters=filters, fields=self._fields(fields)
+        )
+        yield "sources", {"query": query, "metadata": self._metadata(search_result)}
+
+        cache_key = await self._aanswer_key(query, search_result)
+        if cache_key is not None:
+            cached = self._cached_answer(cache_key)
+            if cached is not None:
+                yield "token", cached
+                yield "done", {"answer": cached}
+                return
+
+        answer = []
+        with stage("llm"):
+            start = time.perf_counter()
+            stream = await self.async_openai.chat.completions.create(
+                **self._completion_kwargs(query, search_result), stream=True
+            )
+            try:
+                async for chunk in stream:
+                    # o último chunk pode vir sem choices (uso de tokens) ou sem conteúdo
+                    content = chunk.choices[0].delta.content if chunk.choices else None
+                    if not content:
+                        continue
+                    if not answer:
+                        # tempo até o primeiro token: o que o usuário sente do LLM
+                        STAGE_SECONDS.labels("llm_primeiro_token").observe(time.perf_counter() - start)
+                    answer.append(content)
+                    yield "token", content
+            finally:
+                # cliente que desconecta no meio: encerra a conexão com a OpenAI
+                await stream.close()
+
+        # só chega aqui com a resposta completa (cliente que desconecta não grava)
+        answer = "".join(answer)
+        if cache_key is not None and answer:
+            self.answer_cache.set(*cache_key, answer)
+        yield "done", {"answer": answer}
+
+    async def aclose(self) -> None:
+        await self.async_openai.close()
+        self.openai.close()
+
+    @staticmethod
+    def _chunk_ids(search_result: SearchResponse) -> tuple[str, ...] | None:
+        ids = tuple(result.id for result in search_result.results)
+        # sem fontes, ou resposta antiga do cache de busca (sem ids): fora do cache
+        if not ids or None in ids:
+            return None
+        return ids
+
+    def _answer_key(self, query: str, search_result: SearchResponse) -> tuple | None:
+        """(vetor denso, pergunta, ids dos chunks, versão da coleção), ou None sem cache."""
+        if self.answer_cache is None:
+            return None
+        chunk_ids = self._chunk_ids(search_result)
+        if chunk_ids is None:
+            return None
+        try:
+            version = self.search_service.collection_version()
+            vector = self.search_service.dense_vector(query)
+        except Exception:
+            # sem versão confiável o cache poderia servir respostas de outra ingestão
+            return None
+        return vector, query, chunk_ids, version
+
+    async def _aanswer_key(self, query: str, search_result: SearchResponse) -> tuple | None:
+        if self.answer_cache is None:
+            return None
+        chunk_ids = self._chunk_ids(search_result)
+        if chunk_ids is None:
+            return None
+        try:
+            version = await self.search_service.acollection_version()
+            vector = await self.search_service.adense_vector(query)
+        except Exception:
+            return None
+        return vector, query, chunk_ids, version
 
+    def _cached_answer(self, cache_key: tuple) -> str | None:
+        with stage("cache_rag"):
+            answer = self.answer_cache.get(*cache_key)
+        record_cache("rag", answer is not None)
+        return answer
+
+    @staticmethod
+    def _fields(fields: list[str] | None) -> list[str]:
+        return sorted({"text", *(RAG_FIELDS if fields is None else fields)})
+
+    @staticmethod
+    def _completion_kwargs(query: str, search_result: SearchResponse) -> dict:
         #montagem do contexto
         context = "\n\n".join(result.text for result in search_result.results)
 
         #prompt para o modelo
         prompt = RAG_PROMPT.format(context=context, query=query)
 
-        # chama o modelo de linguagem para gerar a resposta
-        response = self.openai.chat.completions.create(
+        return dict(
             model=settings.openai_model,
             messages=[{"role": "user", "content": prompt}],
             temperature=0,
         )
 
+    @staticmethod
+    def _build_response(query: str, search_result: SearchResponse, answer: str) -> RAGResponse:
         # inclui a resposta e os metadados dos resultados da busca na resposta final
-        metadata = [{**result.metadata,
-                     "score":result.score,
-                     } for result in search_result.results
-        ]
-
         return RAGResponse(
             query=query,
-            answer=response.choices[0].message.content,
-            metadata=metadata,
-        )
\ No newline at end of file
+            answer=answer,
+            metadata=RagService._metadata(search_result),
+        )
+
+    @staticmethod
+    def _metadata(search_result: SearchResponse) -> list[dict]:
+        return [{**result.metadata,
+                 "score":result.score,
+                 } for result in search_result.results
+        ]
@@ -0,0 +1,104 @@
+import hashlib
+import json
+import logging
+from typing import Protocol
+
+from pydantic import BaseModel
+
+from api.models.search_models import SearchResponse
+from api.services.cache import LRUCache
+
+
+logger = logging.getLogger(__name__)
+
+
+def search_cache_key(collection_version: str, **params) -> str:
+    """
+    Chave determinística para um resultado de busca.
+
+    `params` deve conter tudo que altera o resultado (consulta normalizada,
+    limit etc.); a versão da coleção faz com que novas ingestões invalidem as
+    entradas anteriores sem precisar apagá-las.
+    """
+    payload = json.dumps(params, sort_keys=True, ensure_ascii=False, default=str)
+    digest = hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    return f"busca:{collection_version}:{digest}"
+
+
+class SearchCacheBackend(Protocol):
+    """`model` é o tipo da resposta guardada (SearchResponse ou GroupedSearchResponse)."""
+
+    def get(self, key: str, model: type[BaseModel] = SearchResponse) -> BaseModel | None: ...
+
+    def set(self, key: str, value: BaseModel) -> None: ...
+
+
+class InMemorySearchCache:
+    """Backend padrão: LRU no processo (cada réplica tem o seu)."""
+
+    def __init__(self, maxsize: int, ttl: float | None = None):
+        self.cache = LRUCache(maxsize, ttl)
+
+    def get(self, key: str, model: type[BaseModel] = SearchResponse) -> BaseModel | None:
+        return self.cache.get(key)
+
+    def set(self, key: str, value: BaseModel) -> None:
+        self.cache.set(key, value)
+
+    def stats(self) -> dict:
+        return self.cache.stats()
+
+
+class RedisSearchCache:
+    """Backend compartilhado entre réplicas. Falhas do Redis viram cache miss."""
+
+    # chamadas de rede: o SearchService assíncrono as executa fora do event loop
+    blocking = True
+
+    def __init__(self, url: str, ttl: float | None = None, prefix: str = "ipea:"):
+        import redis
+
+        self.redis = redis.Redis.from_url(url)
+        self.ttl = int(ttl) if ttl else None
+        self.prefix = prefix
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str, model: type[BaseModel] = SearchResponse) -> BaseModel | None:
+        try:
+            raw = self.redis.get(self.prefix + key)
+        except Exception:
+            logger.warning("Falha ao ler o cache de busca no Redis", exc_info=True)
+            raw = None
+
+        if raw is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return model.model_validate_json(raw)
+
+    def set(self, key: str, value: BaseModel) -> None:
+        try:
+            self.redis.set(self.prefix + key, value.model_dump_json(), ex=self.ttl)
+        except Exception:
+            logger.warning("Falha ao gravar o cache de busca no Redis", exc_info=True)
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+
+def create_search_cache(backend: str, size: int, ttl: float | None, url: str | None) -> SearchCacheBackend | None:
+    if backend == "none" or size <= 0:
+        return None
+    if backend == "memory":
+        return InMemorySearchCache(size, ttl)
+    if backend == "redis":
+        if not url:
+            raise ValueError("search_cache_url é obrigatório para o backend 'redis'.")
+        return RedisSearchCache(url, ttl)
+    raise ValueError(f"Backend de cache de busca inválido: {backend!r}")
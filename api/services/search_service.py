@@ -1,78 +1,677 @@
+import asyncio
 import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 
-from qdrant_client import QdrantClient, models
-from api.models.search_models import SearchResult, SearchResponse
+import numpy as np
+from qdrant_client import AsyncQdrantClient, QdrantClient, models
+from api.config.search_profiles import SearchProfile, build_profiles
+from api.models.search_models import (
+    DocumentHits,
+    GroupedSearchResponse,
+    SearchFilters,
+    SearchRequest,
+    SearchRequestError,
+    SearchResult,
+    SearchResponse,
+)
+from api.services.embedding_server import RemoteEmbeddingsService
 from api.services.embeddings import EmbeddingsService
+from api.services.filters import build_filter
+from api.services.metrics import in_context, record_cache, stage
+from api.services.query_batcher import QueryBatcher
+from api.services.search_cache import SearchCacheBackend, search_cache_key
+from shared.collection_version import aget_collection_version, get_collection_version
+from shared.qdrant import QdrantConfig, get_async_qdrant_client, get_qdrant_client
 
 
 logger = logging.getLogger(__name__)
 
+# campo de agrupamento da busca agrupada (índice KEYWORD em create_collection.py)
+GROUP_BY_FIELD = "metadata.document_id"
+
 
 class SearchServiceError(RuntimeError):
     pass
 
 
 class SearchService:
-    def __init__(self, qdrant_url: str, qdrant_api_key: str, collection_name: str):
-        self.qdrant = QdrantClient(url=qdrant_url, api_key=qdrant_api_key)
+    def __init__(
+        self,
+        qdrant_url: str,
+        qdrant_api_key: str,
+        collection_name: str,
+        search_cache: SearchCacheBackend | None = None,
+        collection_version_ttl: float = 5.0,
+        embedding_workers: int = 4,
+        embedding_batch_window_ms: float = 0.0,
+        embedding_batch_max_size: int = 32,
+        profiles: dict[str, SearchProfile] | None = None,
+        default_profile: str = "balanced",
+        batch_size: int = 64,
+        qdrant: QdrantClient | None = None,
+        async_qdrant: AsyncQdrantClient | None = None,
+        embeddings_service: EmbeddingsService | RemoteEmbeddingsService | None = None,
+    ):
+        # clientes e embeddings injetados substituem os padrões (ex.: api/benchmark);
+        # os clientes são compartilhados (shared.qdrant) e fechados no fim do lifespan
+        config = QdrantConfig(url=qdrant_url, api_key=qdrant_api_key)
+        self.qdrant = qdrant or get_qdrant_client(config)
+        self.async_qdrant = async_qdrant or get_async_qdrant_client(config)
         self.collection_name = collection_name
-        self._embeddings_service: EmbeddingsService | None = None
+        self.profiles = profiles or build_profiles()
+        self.default_profile = self.get_profile(default_profile)
+        self.batch_size = batch_size
+        self._embeddings_service = embeddings_service
+        self._embeddings_lock = threading.Lock()
+        self.search_cache = search_cache
+        self.collection_version_ttl = collection_version_ttl
+        self._collection_version: str | None = None
+        self._collection_version_checked_at = 0.0
+        self._collection_version_error: Exception | None = None
+        # o embedding é CPU-bound: nas rotas assíncronas roda neste pool limitado
+        # para não bloquear o event loop nem disputar CPU sem limite
+        self.embedding_executor = ThreadPoolExecutor(
+            max_workers=embedding_workers,
+            thread_name_prefix="embeddings",
+        )
+        # com janela > 0, consultas concorrentes são agrupadas em uma única
+        # inferência por modelo (troca alguns ms de latência por vazão)
+        self.query_batcher = (
+            QueryBatcher(
+                self._embed_batch,
+                window_ms=embedding_batch_window_ms,
+                max_batch=embedding_batch_max_size,
+            )
+            if embedding_batch_window_ms > 0
+            else None
+        )
 
     @property
-    def embeddings_service(self) -> EmbeddingsService:
+    def embeddings_service(self) -> EmbeddingsService | RemoteEmbeddingsService:
+        # carrega os três modelos: só deve ser resolvida fora do event loop, e
+        # o lock evita que primeiras requisições simultâneas carreguem em dobro
         if self._embeddings_service is None:
-            self._embeddings_service = EmbeddingsService()
+            with self._embeddings_lock:
+                if self._embeddings_service is None:
+                    self._embeddings_service = EmbeddingsService()
         return self._embeddings_service
 
-    def search(self, query: str, limit: int = 3) -> SearchResponse:
+    async def warmup(self) -> None:
+        """
+        Carrega os três modelos, roda uma inferência de aquecimento e abre a
+        conexão com o Qdrant, para que a primeira requisição não pague esse custo.
+        """
+        loop = asyncio.get_running_loop()
+        embeddings_service = await loop.run_in_executor(
+            self.embedding_executor, lambda: self.embeddings_service
+        )
+        await loop.run_in_executor(self.embedding_executor, embeddings_service.warmup)
+
+        await self.async_qdrant.get_collection(self.collection_name)
+        await self.acollection_version()
+
+    async def aclose(self) -> None:
+        if self.query_batcher is not None:
+            self.query_batcher.close()
+        self.embedding_executor.shutdown(wait=False, cancel_futures=True)
+        if self._embeddings_service is not None:
+            self._embeddings_service.close()
+
+    def get_profile(self, name: str | None) -> SearchProfile:
+        if name is None:
+            return self.default_profile
         try:
-            query_dense, query_sparse, query_colbert = self.embeddings_service.embed_query(query)
-        except Exception as exc:
-            logger.exception("Falha ao gerar embeddings para a consulta %r", query)
+            return self.profiles[name]
+        except KeyError:
+            raise SearchRequestError(
+                f"Perfil de busca desconhecido: {name!r}. Opções: {sorted(self.profiles)}"
+            ) from None
+
+    def _version_is_stale(self) -> bool:
+        if self._collection_version is None and self._collection_version_error is None:
+            return True
+        return time.monotonic() - self._collection_version_checked_at > self.collection_version_ttl
+
+    def _cached_version(self) -> str:
+        if self._collection_version is None:
+            # a última leitura falhou há menos de collection_version_ttl: não
+            # insiste no Qdrant a cada busca, quem chama só pula o cache
             raise SearchServiceError(
-                "Falha ao gerar embeddings da consulta. Verifique os modelos e dependencias do fastembed."
-            ) from exc
+                f"Versão da coleção {self.collection_name!r} indisponível"
+            ) from self._collection_version_error
+        return self._collection_version
+
+    def _store_version(self, version: str | None, exc: Exception | None) -> str:
+        # sucesso ou falha, a próxima leitura só acontece depois do TTL, então
+        # o traceback aparece no log no máximo uma vez por janela
+        self._collection_version_checked_at = time.monotonic()
+        if exc is not None:
+            logger.warning("Falha ao ler a versao da colecao %r", self.collection_name, exc_info=exc)
+            self._collection_version_error = exc
+            if self._collection_version is None:
+                raise exc
+        else:
+            self._collection_version = version
+            self._collection_version_error = None
+        return self._collection_version
+
+    def collection_version(self) -> str:
+        """
+        Versão da coleção (ver shared.collection_version), relida do Qdrant no
+        máximo a cada collection_version_ttl segundos.
+        """
+        if not self._version_is_stale():
+            return self._cached_version()
+        try:
+            version = get_collection_version(self.qdrant, self.collection_name)
+        except Exception as exc:
+            return self._store_version(None, exc)
+        return self._store_version(version, None)
+
+    async def acollection_version(self) -> str:
+        if not self._version_is_stale():
+            return self._cached_version()
+        try:
+            version = await aget_collection_version(self.async_qdrant, self.collection_name)
+        except Exception as exc:
+            return self._store_version(None, exc)
+        return self._store_version(version, None)
+
+    def _build_cache_key(
+        self,
+        version: str,
+        query: str,
+        limit: int,
+        profile: SearchProfile,
+        filters: SearchFilters | None,
+        **extra,
+    ) -> str:
+        return search_cache_key(
+            version,
+            query=EmbeddingsService.normalize_query(query),
+            limit=limit,
+            # os parâmetros entram inteiros: sobrescrever um perfil invalida o cache dele
+            profile=profile.as_dict(),
+            filters=filters.model_dump(exclude_none=True) if filters is not None else None,
+            **extra,
+        )
+
+    def _cache_key(
+        self,
+        query: str,
+        limit: int,
+        profile: SearchProfile,
+        filters: SearchFilters | None,
+        **extra,
+    ) -> str | None:
+        if self.search_cache is None:
+            return None
+        try:
+            version = self.collection_version()
+        except Exception:
+            # sem versão confiável o cache poderia servir resultados antigos
+            return None
+        return self._build_cache_key(version, query, limit, profile, filters, **extra)
+
+    async def _acache_key(
+        self,
+        query: str,
+        limit: int,
+        profile: SearchProfile,
+        filters: SearchFilters | None,
+        **extra,
+    ) -> str | None:
+        if self.search_cache is None:
+            return None
+        try:
+            version = await self.acollection_version()
+        except Exception:
+            return None
+        return self._build_cache_key(version, query, limit, profile, filters, **extra)
+
+    def _cache_get(self, key: str, model=SearchResponse):
+        with stage("cache"):
+            cached = self.search_cache.get(key, model)
+        record_cache("busca", cached is not None)
+        return cached
+
+    async def _acache_call(self, method, *args):
+        """Backends de rede (Redis) rodam fora do event loop; o LRU local não."""
+        with stage("cache"):
+            if getattr(self.search_cache, "blocking", False):
+                return await asyncio.get_running_loop().run_in_executor(None, method, *args)
+            return method(*args)
+
+    async def _acache_get(self, key: str, model=SearchResponse):
+        cached = await self._acache_call(self.search_cache.get, key, model)
+        record_cache("busca", cached is not None)
+        return cached
+
+    def search(
+        self,
+        query: str,
+        limit: int = 3,
+        profile: str | None = None,
+        filters: SearchFilters | None = None,
+        fields: list[str] | None = None,
+    ) -> SearchResponse:
+        search_profile = self.get_profile(profile)
+        cache_key = self._cache_key(query, limit, search_profile, filters, fields=fields)
+        if cache_key is not None:
+            cached = self._cache_get(cache_key)
+            if cached is not None:
+                return cached
+
+        query_filter = build_filter(filters)
+        query_vectors = self._embed(query, search_profile.embeddings)
+        try:
+            with stage("qdrant"):
+                results = self.qdrant.query_points(
+                    **self._query_kwargs(*query_vectors, limit, search_profile, query_filter),
+                    with_payload=self._with_payload(fields),
+                )
+        except Exception as exc:
+            raise self._qdrant_error(query) from exc
+        response = self._to_response(results.points)
+
+        if cache_key is not None:
+            self.search_cache.set(cache_key, response)
+        return response
+
+    async def asearch(
+        self,
+        query: str,
+        limit: int = 3,
+        profile: str | None = None,
+        filters: SearchFilters | None = None,
+        fields: list[str] | None = None,
+    ) -> SearchResponse:
+        """Mesma busca de search, sem bloquear o event loop."""
+        search_profile = self.get_profile(profile)
+        cache_key = await self._acache_key(query, limit, search_profile, filters, fields=fields)
+        if cache_key is not None:
+            cached = await self._acache_get(cache_key)
+            if cached is not None:
+                return cached
+
+        query_filter = build_filter(filters)
+        query_vectors = await self._aembed(query, search_profile.embeddings)
+        try:
+            with stage("qdrant"):
+                results = await self.async_qdrant.query_points(
+                    **self._query_kwargs(*query_vectors, limit, search_profile, query_filter),
+                    with_payload=self._with_payload(fields),
+                )
+        except Exception as exc:
+            raise self._qdrant_error(query) from exc
+        response = self._to_response(results.points)
+
+        if cache_key is not None:
+            await self._acache_call(self.search_cache.set, cache_key, response)
+        return response
+
+    def search_grouped(
+        self,
+        query: str,
+        limit: int = 3,
+        group_size: int = 2,
+        profile: str | None = None,
+        filters: SearchFilters | None = None,
+        fields: list[str] | None = None,
+    ) -> GroupedSearchResponse:
+        """
+        Busca agrupada por metadata.document_id: até `limit` documentos
+        distintos, cada um com até `group_size` chunks, em uma única chamada.
+        """
+        search_profile = self.get_profile(profile)
+        cache_key = self._cache_key(query, limit, search_profile, filters, group_size=group_size, fields=fields)
+        if cache_key is not None:
+            cached = self._cache_get(cache_key, GroupedSearchResponse)
+            if cached is not None:
+                return cached
+
+        query_filter = build_filter(filters)
+        query_vectors = self._embed(query, search_profile.embeddings)
+        try:
+            with stage("qdrant"):
+                results = self.qdrant.query_points_groups(
+                    **self._query_kwargs(*query_vectors, limit, search_profile, query_filter),
+                    group_by=GROUP_BY_FIELD,
+                    group_size=group_size,
+                    with_payload=self._with_payload(fields),
+                )
+        except Exception as exc:
+            raise self._qdrant_error(query) from exc
+        response = self._to_grouped_response(results.groups)
+
+        if cache_key is not None:
+            self.search_cache.set(cache_key, response)
+        return response
+
+    async def asearch_grouped(
+        self,
+        query: str,
+        limit: int = 3,
+        group_size: int = 2,
+        profile: str | None = None,
+        filters: SearchFilters | None = None,
+        fields: list[str] | None = None,
+    ) -> GroupedSearchResponse:
+        """Mesma busca de search_grouped, sem bloquear o event loop."""
+        search_profile = self.get_profile(profile)
+        cache_key = await self._acache_key(query, limit, search_profile, filters, group_size=group_size, fields=fields)
+        if cache_key is not None:
+            cached = await self._acache_get(cache_key, GroupedSearchResponse)
+            if cached is not None:
+                return cached
+
+        query_filter = build_filter(filters)
+        query_vectors = await self._aembed(query, search_profile.embeddings)
+        try:
+            with stage("qdrant"):
+                results = await self.async_qdrant.query_points_groups(
+                    **self._query_kwargs(*query_vectors, limit, search_profile, query_filter),
+                    group_by=GROUP_BY_FIELD,
+                    group_size=group_size,
+                    with_payload=self._with_payload(fields),
+                )
+        except Exception as exc:
+            raise self._qdrant_error(query) from exc
+        response = self._to_grouped_response(results.groups)
+
+        if cache_key is not None:
+            await self._acache_call(self.search_cache.set, cache_key, response)
+        return response
+
+    def search_many(self, requests: list[SearchRequest]) -> list[SearchResponse]:
+        """
+        Várias buscas de uma vez: as que não estão no cache são embedadas em um
+        lote por modelo e enviadas em um único query_batch_points (em blocos de
+        batch_size). As respostas seguem a ordem de `requests`.
+        """
+        profiles = [self.get_profile(request.profile) for request in requests]
+        query_filters = [build_filter(request.filters) for request in requests]
+        keys = [
+            self._cache_key(request.query, request.limit, profile, request.filters, fields=request.fields)
+            for request, profile in zip(requests, profiles)
+        ]
+        responses = [self._cache_get(key) if key is not None else None for key in keys]
+
+        for chunk in self._pending_chunks(responses):
+            items = [(requests[i].query, profiles[i].embeddings) for i in chunk]
+            try:
+                with stage("embedding"):
+                    vectors = self._embed_batch(items)
+            except Exception as exc:
+                raise self._embedding_error(items[0][0]) from exc
+
+            try:
+                with stage("qdrant"):
+                    results = self.qdrant.query_batch_points(
+                        collection_name=self.collection_name,
+                        requests=self._query_requests(chunk, requests, profiles, query_filters, vectors),
+                    )
+            except Exception as exc:
+                raise self._qdrant_error(items[0][0]) from exc
+
+            for i, result in zip(chunk, results):
+                responses[i] = self._to_response(result.points)
+                if keys[i] is not None:
+                    self.search_cache.set(keys[i], responses[i])
+
+        return responses
+
+    async def asearch_many(self, requests: list[SearchRequest]) -> list[SearchResponse]:
+        """Mesma busca em lote de search_many, sem bloquear o event loop."""
+        profiles = [self.get_profile(request.profile) for request in requests]
+        query_filters = [build_filter(request.filters) for request in requests]
+        keys = [
+            await self._acache_key(
+                request.query, request.limit, profile, request.filters, fields=request.fields
+            )
+            for request, profile in zip(requests, profiles)
+        ]
+        responses = [
+            await self._acache_get(key) if key is not None else None
+            for key in keys
+        ]
+
+        loop = asyncio.get_running_loop()
+        for chunk in self._pending_chunks(responses):
+            items = [(requests[i].query, profiles[i].embeddings) for i in chunk]
+            try:
+                with stage("embedding"):
+                    vectors = await loop.run_in_executor(self.embedding_executor, in_context(self._embed_batch, items))
+            except Exception as exc:
+                raise self._embedding_error(items[0][0]) from exc
+
+            try:
+                with stage("qdrant"):
+                    results = await self.async_qdrant.query_batch_points(
+                        collection_name=self.collection_name,
+                        requests=self._query_requests(chunk, requests, profiles, query_filters, vectors),
+                    )
+            except Exception as exc:
+                raise self._qdrant_error(items[0][0]) from exc
+
+            for i, result in zip(chunk, results):
+                responses[i] = self._to_response(result.points)
+                if keys[i] is not None:
+                    await self._acache_call(self.search_cache.set, keys[i], responses[i])
+
+        return responses
+
+    def _pending_chunks(self, responses: list[SearchResponse | None]):
+        pending = [i for i, response in enumerate(responses) if response is None]
+        for start in range(0, len(pending), self.batch_size):
+            yield pending[start:start + self.batch_size]
+
+    def _query_requests(
+        self,
+        chunk: list[int],
+        requests: list[SearchRequest],
+        profiles: list[SearchProfile],
+        query_filters: list[models.Filter | None],
+        vectors: list[tuple],
+    ) -> list[models.QueryRequest]:
+        """Mesmo pipeline de _query_kwargs, no formato de uma requisição do lote."""
+        query_requests = []
+        for i, query_vectors in zip(chunk, vectors):
+            kwargs = self._query_kwargs(
+                *query_vectors,
+                requests[i].limit,
+                profiles[i],
+                query_filters[i],
+            )
+            query = kwargs["query"]
+            query_requests.append(
+                models.QueryRequest(
+                    prefetch=kwargs.get("prefetch"),
+                    query=query.tolist() if isinstance(query, np.ndarray) else query,
+                    using=kwargs.get("using"),
+                    filter=kwargs.get("query_filter"),
+                    params=kwargs.get("search_params"),
+                    limit=kwargs["limit"],
+                    with_payload=self._with_payload(requests[i].fields),
+                )
+            )
+        return query_requests
+
+    def _embed_batch(self, items: list[tuple[str, tuple[str, ...]]]) -> list[tuple]:
+        """Lote do QueryBatcher: (consulta, modelos do perfil) por item."""
+        return self.embeddings_service.embed_batch(items)
+
+    def dense_vector(self, query: str) -> np.ndarray:
+        """
+        Vetor denso da consulta (ex.: chave do cache semântico do RAG). Logo
+        após uma busca sai do cache de embeddings, sem nova inferência.
+        """
+        return self._embed(query, ("dense",))[0]
+
+    async def adense_vector(self, query: str) -> np.ndarray:
+        return (await self._aembed(query, ("dense",)))[0]
+
+    def _embed(self, query: str, kinds: tuple[str, ...]):
+        try:
+            with stage("embedding"):
+                if self.query_batcher is not None:
+                    return self.query_batcher.submit((query, kinds)).result()
+                return self.embeddings_service.embed_query(query, kinds)
+        except Exception as exc:
+            raise self._embedding_error(query) from exc
+
+    async def _aembed(self, query: str, kinds: tuple[str, ...]):
+        # tempo de parede visto pela requisição (fila do pool ou janela do
+        # batcher incluídas); a inferência de cada modelo é medida no EmbeddingsService
+        try:
+            with stage("embedding"):
+                if self.query_batcher is not None:
+                    return await asyncio.wrap_future(self.query_batcher.submit((query, kinds)))
+                # o serviço é resolvido na thread: sem aquecimento, a carga dos
+                # modelos não trava o event loop
+                return await asyncio.get_running_loop().run_in_executor(
+                    self.embedding_executor, in_context(lambda: self.embeddings_service.embed_query(query, kinds))
+                )
+        except Exception as exc:
+            raise self._embedding_error(query) from exc
+
+    @staticmethod
+    def _embedding_error(query: str) -> SearchServiceError:
+        logger.exception("Falha ao gerar embeddings para a consulta %r", query)
+        return SearchServiceError(
+            "Falha ao gerar embeddings da consulta. Verifique os modelos e dependencias do fastembed."
+        )
+
+    def _query_kwargs(
+        self,
+        query_dense,
+        query_sparse,
+        query_colbert,
+        limit: int,
+        profile: SearchProfile,
+        query_filter: models.Filter | None = None,
+    ) -> dict:
         """
         dense: semantica.
         sparse: macth das palavras chaves
         colbert: junta tudo
+
+        O perfil decide o que entra: sem sparse não há fusão, sem ColBERT o
+        resultado sai direto da fusão RRF (ou da busca densa). Os vetores
+        chegam como numpy/SparseVector e só aqui viram o formato do Qdrant
+        (a consulta ColBERT de nível superior é convertida pelo cliente).
+
+        O filtro vai dentro de cada prefetch denso/sparse: a busca HNSW já usa
+        os índices de payload e o top-k não é desperdiçado com pontos descartados.
         """
-        try:
-            results = self.qdrant.query_points(
+        search_params = profile.search_params()
+        # Prefetch/QueryRequest são modelos pydantic de listas: um ndarray seria
+        # validado elemento a elemento (~30x mais lento que um único tolist)
+        dense = models.Prefetch(
+            query=query_dense.tolist(),
+            using="dense",
+            limit=profile.dense_limit,
+            params=search_params,
+            filter=query_filter,
+        )
+        candidates = [dense]
+        if profile.use_sparse:
+            candidates.append(
+                models.Prefetch(
+                    query=query_sparse,
+                    using="sparse",
+                    limit=profile.sparse_limit,
+                    filter=query_filter,
+                )
+            )
+        rrf = models.FusionQuery(fusion=models.Fusion.RRF)
+
+        if profile.use_colbert:
+            if len(candidates) > 1:
+                candidates = [models.Prefetch(prefetch=candidates, query=rrf, limit=profile.fusion_limit)]
+            return dict(
                 collection_name=self.collection_name,
-                prefetch=[
-                    {
-                        "prefetch": [
-                            {"query": query_dense, "using": "dense", "limit": 20},
-                            {"query": query_sparse, "using": "sparse", "limit": 20},
-                        ],
-                        "query": models.FusionQuery(fusion=models.Fusion.RRF),
-                        "limit": 20,
-                    }
-                ],
+                prefetch=candidates,
                 query=query_colbert,
                 using="colbert",
                 limit=limit,
             )
-        except Exception as exc:
-            logger.exception(
-                "Falha ao consultar o Qdrant na colecao %r para a consulta %r",
-                self.collection_name,
-                query,
+
+        if len(candidates) > 1:
+            return dict(
+                collection_name=self.collection_name,
+                prefetch=candidates,
+                query=rrf,
+                limit=limit,
             )
-            raise SearchServiceError(
-                "Falha ao consultar o Qdrant. Verifique URL, chave da API, colecao e configuracao dos vetores."
-            ) from exc
-        if not results.points:
-            return SearchResponse(results=[])
 
-        max_score = max(result.score for result in results.points)
+        return dict(
+            collection_name=self.collection_name,
+            query=dense.query,
+            using="dense",
+            search_params=search_params,
+            query_filter=query_filter,
+            limit=limit,
+        )
+
+    def _qdrant_error(self, query: str) -> SearchServiceError:
+        logger.exception(
+            "Falha ao consultar o Qdrant na colecao %r para a consulta %r",
+            self.collection_name,
+            query,
+        )
+        return SearchServiceError(
+            "Falha ao consultar o Qdrant. Verifique URL, chave da API, colecao e configuracao dos vetores."
+        )
+
+    @staticmethod
+    def _with_payload(fields: list[str] | None) -> bool | models.PayloadSelectorInclude:
+        """Projeção pedida pelo cliente, aplicada no Qdrant: só os campos pedidos trafegam."""
+        if fields is None:
+            return True
+        return models.PayloadSelectorInclude(include=fields)
+
+    @staticmethod
+    def _to_grouped_response(groups) -> GroupedSearchResponse:
+        if not groups:
+            return GroupedSearchResponse.model_construct(groups=[])
+
+        # mesma normalização de _to_response, sobre todos os chunks retornados
+        max_score = max(hit.score for group in groups for hit in group.hits)
+        return GroupedSearchResponse.model_construct(
+            groups=[
+                DocumentHits.model_construct(
+                    document_id=str(group.id),
+                    score=group.hits[0].score / max_score if max_score > 0 else 0,
+                    results=[
+                        SearchResult.model_construct(
+                            id=str(hit.id),
+                            score=hit.score / max_score if max_score > 0 else 0,
+                            text=hit.payload.get("text"),
+                            metadata=hit.payload.get("metadata", {}),
+                        )
+                        for hit in group.hits
+                    ],
+                )
+                for group in groups
+            ]
+        )
+
+    @staticmethod
+    def _to_response(points) -> SearchResponse:
+        if not points:
+            return SearchResponse.model_construct(results=[])
+
+        max_score = max(result.score for result in points)
         search_results = [
-            SearchResult(
+            SearchResult.model_construct(
+                id=str(result.id),
                 score=result.score / max_score if max_score > 0 else 0,
-                text=result.payload["text"],
-                metadata=result.payload["metadata"],
+                text=result.payload.get("text"),
+                metadata=result.payload.get("metadata", {}),
             )
-            for result in results.points
+            for result in points
         ]
-        return SearchResponse(results=search_results)
+        return SearchResponse.model_construct(results=search_results)
@@ -0,0 +1,69 @@
+"""
+Testes do cursor de paginação do catálogo de documentos (/documents).
+
+Rodar da raiz do repositório:
+    python -m api.teste.teste_catalog
+"""
+import base64
+import json
+
+from api.services.catalog import decode_cursor, encode_cursor
+
+
+def forjar(payload) -> str:
+    return base64.urlsafe_b64encode(json.dumps(payload).encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def esperar_cursor_invalido(cursor: str, sort: str = "titulo", order: str = "asc"):
+    try:
+        decode_cursor(cursor, sort, order)
+    except ValueError as exc:
+        assert str(exc) == "Cursor inválido.", exc
+    else:
+        raise AssertionError(f"cursor aceito: {cursor!r}")
+
+
+# ======================================
+# TESTE 1 - Ida e volta do cursor
+# ======================================
+
+def teste_cursor_ida_e_volta():
+    for valor in ("Título", 2020, 1.5, None):
+        cursor = encode_cursor("titulo", "asc", valor, "td_123")
+        assert decode_cursor(cursor, "titulo", "asc") == (valor, "td_123")
+
+
+# ======================================
+# TESTE 2 - Cursor forjado com tipos errados
+# ======================================
+
+def teste_cursor_forjado():
+    esperar_cursor_invalido(forjar(["titulo", "asc", [1], "x"]))
+    esperar_cursor_invalido(forjar(["titulo", "asc", {"a": 1}, "x"]))
+    esperar_cursor_invalido(forjar(["titulo", "asc", True, "x"]))
+    esperar_cursor_invalido(forjar(["titulo", "asc", "a", 1]))
+    esperar_cursor_invalido(forjar(["titulo", "asc", "a", None]))
+    esperar_cursor_invalido(forjar(["titulo", "asc", "a"]))
+    esperar_cursor_invalido("isso não é base64")
+
+
+# ======================================
+# TESTE 3 - Cursor de outra ordenação
+# ======================================
+
+def teste_cursor_outra_ordenacao():
+    cursor = encode_cursor("ano", "desc", 2020, "td_123")
+    try:
+        decode_cursor(cursor, "ano", "asc")
+    except ValueError as exc:
+        assert "outra ordenação" in str(exc), exc
+    else:
+        raise AssertionError("cursor de outra ordenação aceito")
+
+
+if __name__ == "__main__":
+    teste_cursor_ida_e_volta()
+    teste_cursor_forjado()
+    teste_cursor_outra_ordenacao()
+
+    print("\n🔥 Testes concluídos.")
@@ -0,0 +1,67 @@
+"""
+Testes da validação de /search/batch, sem Qdrant nem modelos: o SearchService
+é trocado por um falso via dependency_overrides.
+
+Rodar da raiz do repositório:
+    python -m api.teste.teste_search_batch
+"""
+import os
+
+for var in ("QDRANT_URL", "QDRANT_API_KEY", "OPENAI_API_KEY"):
+    os.environ.setdefault(var, "teste")
+
+from fastapi.testclient import TestClient
+
+from api.config.settings import settings
+from api.dependencies import get_search_service
+from api.main import app
+
+
+class SearchServiceFalso:
+    async def asearch_many(self, requests):
+        return [{"results": []} for _ in requests]
+
+
+def cliente() -> TestClient:
+    app.dependency_overrides[get_search_service] = SearchServiceFalso
+    return TestClient(app)
+
+
+def consultas(total: int) -> dict:
+    return {"queries": [{"query": f"consulta {i}"} for i in range(total)]}
+
+
+# ======================================
+# TESTE 1 - Lote no limite é aceito
+# ======================================
+
+def teste_lote_no_limite():
+    resposta = cliente().post("/search/batch", json=consultas(settings.search_batch_max_queries))
+    assert resposta.status_code == 200, resposta.text
+    assert len(resposta.json()["responses"]) == settings.search_batch_max_queries
+
+
+# ======================================
+# TESTE 2 - Lote acima do limite dá 422
+# ======================================
+
+def teste_lote_acima_do_limite():
+    resposta = cliente().post("/search/batch", json=consultas(settings.search_batch_max_queries + 1))
+    assert resposta.status_code == 422, resposta.text
+
+
+# ======================================
+# TESTE 3 - Lote vazio dá 422
+# ======================================
+
+def teste_lote_vazio():
+    resposta = cliente().post("/search/batch", json=consultas(0))
+    assert resposta.status_code == 422, resposta.text
+
+
+if __name__ == "__main__":
+    teste_lote_no_limite()
+    teste_lote_acima_do_limite()
+    teste_lote_vazio()
+
+    print("\n🔥 Testes concluídos.")
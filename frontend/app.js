@@ -86,11 +86,14 @@ async function sendMessage(event) {
   setLoadingState(true);
   updateSourcesSummary("Buscando resposta e fontes...");
 
+  let answerBody = null;
+
   try {
-    const response = await fetch(getApiUrl("/rag"), {
+    const response = await fetch(getApiUrl("/rag/stream"), {
       method: "POST",
       headers: {
         "Content-Type": "application/json",
+        Accept: "text/event-stream",
       },
       body: JSON.stringify({
         query: message,
@@ -98,30 +101,113 @@ async function sendMessage(event) {
       }),
     });
 
-    if (!response.ok) {
+    if (!response.ok || !response.body) {
       throw new Error(`Falha na API (${response.status})`);
     }
 
-    const data = await response.json();
-    addMessage(data.answer || "Nao foi possivel gerar uma resposta.", "assistant");
-    updateDocuments(data.metadata || []);
-    updateSourcesSummary(buildSourcesSummary(data.metadata || []));
+    let answer = "";
+
+    // fontes chegam logo apos a busca; a resposta vem token a token
+    await readServerSentEvents(response, (eventName, data) => {
+      if (eventName === "sources") {
+        const metadata = data.metadata || [];
+        updateDocuments(metadata);
+        updateSourcesSummary(buildSourcesSummary(metadata));
+        setStatus("Gerando resposta");
+        answerBody = addMessage("", "assistant");
+        return;
+      }
+
+      if (eventName === "token") {
+        answer += data;
+        answerBody.textContent = answer;
+        elements.messages.scrollTop = elements.messages.scrollHeight;
+        return;
+      }
+
+      if (eventName === "done") {
+        answer = data.answer || answer;
+        return;
+      }
+
+      if (eventName === "error") {
+        throw new Error(data.detail || "Falha ao gerar a resposta");
+      }
+    });
+
+    if (!answerBody) {
+      throw new Error("Resposta sem fontes");
+    }
+
+    answerBody.textContent = answer || "Nao foi possivel gerar uma resposta.";
     setStatus("Resposta pronta");
   } catch (error) {
     console.error("Erro ao consultar a API:", error);
-    addMessage(
-      `Nao consegui consultar a API agora. Verifique a URL configurada (${getApiUrl("") || "mesma origem"}) e se o backend esta ativo.`,
-      "assistant error",
-    );
-    updateDocuments([]);
-    updateSourcesSummary("Nenhuma fonte disponivel por causa de um erro de comunicacao.");
-    setStatus("Falha na consulta");
+
+    if (answerBody) {
+      // fontes ja exibidas: a falha foi na geracao da resposta
+      answerBody.parentElement.classList.add("error");
+      answerBody.textContent = `${answerBody.textContent}\n\nA geracao da resposta foi interrompida. Tente novamente.`.trim();
+      setStatus("Resposta incompleta");
+    } else {
+      addMessage(
+        `Nao consegui consultar a API agora. Verifique a URL configurada (${getApiUrl("") || "mesma origem"}) e se o backend esta ativo.`,
+        "assistant error",
+      );
+      updateDocuments([]);
+      updateSourcesSummary("Nenhuma fonte disponivel por causa de um erro de comunicacao.");
+      setStatus("Falha na consulta");
+    }
   } finally {
     setLoadingState(false);
     elements.userInput.focus();
   }
 }
 
+async function readServerSentEvents(response, onEvent) {
+  // EventSource so faz GET: o stream do POST e lido e separado aqui
+  const reader = response.body.pipeThrough(new TextDecoderStream()).getReader();
+  let buffer = "";
+
+  try {
+    while (true) {
+      const { value, done } = await reader.read();
+      if (done) {
+        break;
+      }
+
+      buffer += value.replace(/\r\n/g, "\n");
+      let separator = buffer.indexOf("\n\n");
+
+      while (separator !== -1) {
+        dispatchServerSentEvent(buffer.slice(0, separator), onEvent);
+        buffer = buffer.slice(separator + 2);
+        separator = buffer.indexOf("\n\n");
+      }
+    }
+  } finally {
+    // evento de erro (onEvent lanca) ou falha na leitura: encerra a conexao
+    reader.cancel().catch(() => {});
+  }
+}
+
+function dispatchServerSentEvent(block, onEvent) {
+  let eventName = "message";
+  const dataLines = [];
+
+  block.split("\n").forEach((line) => {
+    if (line.startsWith("event:")) {
+      eventName = line.slice(6).trim();
+    } else if (line.startsWith("data:")) {
+      dataLines.push(line.slice(5).trimStart());
+    }
+  });
+
+  if (dataLines.length) {
+    onEvent(eventName, JSON.parse(dataLines.join("\n")));
+  }
+}
+
 function setLoadingState(isLoading) {
   elements.sendButton.disabled = isLoading;
   elements.userInput.disabled = isLoading;
@@ -155,6 +241,7 @@ function addMessage(text, sender) {
   article.append(label, body);
   elements.messages.appendChild(article);
   elements.messages.scrollTop = elements.messages.scrollHeight;
+  return body;
 }
 
 function updateDocuments(metadata) {
@@ -0,0 +1,306 @@
+"""
+Benchmark dos chunkers (HybridChunker do docling, SemanticChunker e SimpleChunker).
+
+Roda cada chunker sobre uma amostra local e fixa de PDFs (ex.: cache/pdfs) ou
+textos (.txt/.md) e mede:
+
+- chunks/s e documentos/s (a conversão dos PDFs e o carregamento dos modelos
+  ficam fora da medição)
+- pico de memória (RSS) durante o chunking
+- distribuição do tamanho dos chunks em tokens
+- custo de embedding a jusante: tokens a embedar e, com --embedding, o
+  tempo real do modelo denso sobre os chunks
+
+O resultado é gravado em JSON com o commit atual, para comparar entre commits:
+
+    python -m ingestao.benchmark.chunkers --amostra cache/pdfs --limite 10
+    python -m ingestao.benchmark.chunkers --amostra cache/pdfs --comparar resultados/anterior.json
+"""
+import argparse
+import hashlib
+import json
+import subprocess
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+from shared.model_registry import model_registry, rss_bytes
+
+MODEL_NAME = "intfloat/multilingual-e5-large"
+MAX_TOKENS = 600
+CHUNKERS = ("hybrid", "semantic", "simple")
+EXTENSOES = (".pdf", ".md", ".txt")
+RESULTADOS_DIR = Path(__file__).resolve().parent / "resultados"
+
+
+@dataclass
+class Documento:
+    caminho: Path
+    sha256: str
+    texto: str
+    docling: Any = None
+
+
+class PicoMemoria:
+    """Amostra o RSS do processo em uma thread e guarda o pico."""
+
+    def __init__(self, intervalo: float = 0.01):
+        self.intervalo = intervalo
+        self.inicio = 0
+        self.pico = 0
+        self._parar = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _amostrar(self):
+        while not self._parar.is_set():
+            self.pico = max(self.pico, rss_bytes())
+            time.sleep(self.intervalo)
+
+    def __enter__(self):
+        self.inicio = self.pico = rss_bytes()
+        self._thread = threading.Thread(target=self._amostrar, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._parar.set()
+        self._thread.join()
+        self.pico = max(self.pico, rss_bytes())
+
+    @property
+    def delta(self) -> int:
+        return self.pico - self.inicio
+
+
+def _commit_atual() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def carregar_amostra(diretorio: Path, limite: Optional[int]) -> List[Documento]:
+    """
+    Lê os arquivos da amostra em ordem de nome (amostra determinística).
+    PDFs e .md são convertidos pelo docling uma única vez, fora da medição.
+    """
+    arquivos = sorted(p for p in diretorio.iterdir() if p.suffix.lower() in EXTENSOES)
+    if limite:
+        arquivos = arquivos[:limite]
+
+    converter = None
+    documentos = []
+    for caminho in arquivos:
+        sha256 = hashlib.sha256(caminho.read_bytes()).hexdigest()
+
+        if caminho.suffix.lower() == ".txt":
+            documentos.append(Documento(caminho, sha256, caminho.read_text(encoding="utf-8")))
+            continue
+
+        if converter is None:
+            from docling.datamodel.base_models import InputFormat
+            from docling.datamodel.pipeline_options import PdfPipelineOptions
+            from docling.document_converter import DocumentConverter, PdfFormatOption
+
+            # sem OCR: a amostra mede os chunkers, não a extração
+            converter = DocumentConverter(
+                format_options={
+                    InputFormat.PDF: PdfFormatOption(
+                        pipeline_options=PdfPipelineOptions(do_ocr=False, do_table_structure=True)
+                    )
+                }
+            )
+
+        doc = converter.convert(caminho).document
+        documentos.append(Documento(caminho, sha256, doc.export_to_markdown(), doc))
+
+    return documentos
+
+
+def criar_chunker(nome: str, max_tokens: int) -> Callable[[Documento], Optional[List[str]]]:
+    """Constrói o chunker (e carrega seus modelos) antes da medição."""
+    if nome == "hybrid":
+        from docling_core.transforms.chunker import HybridChunker
+        from docling_core.transforms.chunker.tokenizer.huggingface import HuggingFaceTokenizer
+
+        chunker = HybridChunker(
+            tokenizer=HuggingFaceTokenizer(
+                tokenizer=model_registry.tokenizer(MODEL_NAME),
+                max_tokens=max_tokens,
+            ),
+            max_tokens=max_tokens,
+            merge_peers=True,
+        )
+
+        def rodar(doc: Documento):
+            if doc.docling is None:
+                return None
+            return [c.text for c in chunker.chunk(doc.docling)]
+
+        return rodar
+
+    if nome == "semantic":
+        from ingestao.utils.semantic_chunker import SemanticChunker
+
+        semantic = SemanticChunker(model_name=MODEL_NAME, max_tokens=max_tokens)
+        return lambda doc: semantic.create_chunks(doc.texto)
+
+    if nome == "simple":
+        from ingestao.utils.simple_chunker import SimpleChunker
+
+        simple = SimpleChunker(model_name=MODEL_NAME, max_tokens=max_tokens)
+        return lambda doc: simple.create_chunks(doc.texto)
+
+    raise ValueError(f"Chunker desconhecido: {nome!r}. Opções: {CHUNKERS}")
+
+
+def distribuicao_tokens(chunks: List[str], max_tokens: int) -> Dict[str, float]:
+    if not chunks:
+        return {}
+
+    tokenizer = model_registry.tokenizer(MODEL_NAME)
+    tamanhos = np.array([
+        len(ids) for ids in tokenizer(chunks, add_special_tokens=False, verbose=False)["input_ids"]
+    ])
+    return {
+        "min": int(tamanhos.min()),
+        "p10": float(np.percentile(tamanhos, 10)),
+        "p50": float(np.percentile(tamanhos, 50)),
+        "p90": float(np.percentile(tamanhos, 90)),
+        "p99": float(np.percentile(tamanhos, 99)),
+        "max": int(tamanhos.max()),
+        "media": float(tamanhos.mean()),
+        "desvio": float(tamanhos.std()),
+        "acima_do_limite": float((tamanhos > max_tokens).mean()),
+        # o modelo denso trunca em 512 tokens; é isso que custa no embedding
+        "tokens_embedding": int(np.minimum(tamanhos, 512).sum()),
+    }
+
+
+def medir_embedding(chunks: List[str], batch_size: int = 32) -> Dict[str, float]:
+    dense = model_registry.dense(MODEL_NAME)
+    dense.embed_documents(chunks[:1])  # aquecimento
+
+    inicio = time.perf_counter()
+    for i in range(0, len(chunks), batch_size):
+        dense.embed_documents(chunks[i:i + batch_size], batch_size=batch_size)
+    duracao = time.perf_counter() - inicio
+
+    return {
+        "segundos": duracao,
+        "chunks_por_s": len(chunks) / duracao if duracao > 0 else 0.0,
+    }
+
+
+def rodar_benchmark(
+    documentos: List[Documento],
+    nomes: List[str],
+    max_tokens: int,
+    embedding: bool,
+) -> Dict[str, Dict[str, Any]]:
+    resultados = {}
+
+    for nome in nomes:
+        rodar = criar_chunker(nome, max_tokens)
+        chunks: List[str] = []
+        processados = 0
+
+        with PicoMemoria() as memoria:
+            inicio = time.perf_counter()
+            for doc in documentos:
+                saida = rodar(doc)
+                if saida is None:
+                    continue
+                chunks.extend(saida)
+                processados += 1
+            duracao = time.perf_counter() - inicio
+
+        resultado = {
+            "documentos": processados,
+            "chunks": len(chunks),
+            "segundos": duracao,
+            "chunks_por_s": len(chunks) / duracao if duracao > 0 else 0.0,
+            "documentos_por_s": processados / duracao if duracao > 0 else 0.0,
+            "pico_memoria_mb": memoria.delta / 2**20,
+            "tokens": distribuicao_tokens(chunks, max_tokens),
+        }
+        if embedding and chunks:
+            resultado["embedding"] = medir_embedding(chunks)
+
+        resultados[nome] = resultado
+        print(
+            f"[{nome}] {processados} docs, {len(chunks)} chunks em {duracao:.2f}s "
+            f"({resultado['chunks_por_s']:.1f} chunks/s, pico +{resultado['pico_memoria_mb']:.0f} MB)"
+        )
+
+    return resultados
+
+
+def comparar(atual: Dict[str, Any], anterior: Dict[str, Any]) -> None:
+    metricas = [
+        ("chunks_por_s", lambda r: r.get("chunks_por_s")),
+        ("pico_memoria_mb", lambda r: r.get("pico_memoria_mb")),
+        ("tokens.p50", lambda r: r.get("tokens", {}).get("p50")),
+        ("tokens_embedding", lambda r: r.get("tokens", {}).get("tokens_embedding")),
+    ]
+
+    print(f"\nComparação com {anterior.get('commit')} ({anterior.get('timestamp')}):")
+    for nome, resultado in atual["resultados"].items():
+        base = anterior.get("resultados", {}).get(nome)
+        if not base:
+            continue
+        for metrica, valor in metricas:
+            novo, velho = valor(resultado), valor(base)
+            if novo is None or not velho:
+                continue
+            print(f"  {nome:<9} {metrica:<17} {velho:>12.2f} -> {novo:>12.2f} ({(novo - velho) / velho:+.1%})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark dos chunkers")
+    parser.add_argument("--amostra", type=Path, default=Path("cache/pdfs"))
+    parser.add_argument("--limite", type=int, default=None)
+    parser.add_argument("--chunkers", nargs="+", choices=CHUNKERS, default=list(CHUNKERS))
+    parser.add_argument("--max-tokens", type=int, default=MAX_TOKENS)
+    parser.add_argument("--embedding", action="store_true", help="mede o tempo real do modelo denso")
+    parser.add_argument("--saida", type=Path, default=RESULTADOS_DIR)
+    parser.add_argument("--comparar", type=Path, default=None)
+    args = parser.parse_args()
+
+    documentos = carregar_amostra(args.amostra, args.limite)
+    if not documentos:
+        raise SystemExit(f"Nenhum arquivo {EXTENSOES} em {args.amostra}")
+
+    commit = _commit_atual()
+    timestamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    resultado = {
+        "commit": commit,
+        "timestamp": timestamp,
+        "config": {
+            "modelo": MODEL_NAME,
+            "backend": model_registry.backend,
+            "max_tokens": args.max_tokens,
+        },
+        "amostra": [{"arquivo": d.caminho.name, "sha256": d.sha256} for d in documentos],
+        "resultados": rodar_benchmark(documentos, args.chunkers, args.max_tokens, args.embedding),
+    }
+
+    args.saida.mkdir(parents=True, exist_ok=True)
+    destino = args.saida / f"chunkers_{timestamp}_{commit or 'sem-commit'}.json"
+    destino.write_text(json.dumps(resultado, indent=2, ensure_ascii=False), encoding="utf-8")
+    print(f"\nResultados gravados em {destino}")
+
+    if args.comparar:
+        comparar(resultado, json.loads(args.comparar.read_text(encoding="utf-8")))
+
+
+if __name__ == "__main__":
+    main()
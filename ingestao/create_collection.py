@@ -1,50 +1,33 @@
-import os
-
 from dotenv import load_dotenv
-from qdrant_client import QdrantClient, models
+from qdrant_client import models
 
-load_dotenv()
+from shared.qdrant import QdrantConfig, get_qdrant_client
 
 COLLECTION_NAME = "publicacoes_ipea"
 
-qdrant = QdrantClient(
-    url=os.getenv("QDRANT_URL"),
-    api_key=os.getenv("QDRANT_API_KEY"),
-    timeout=120,
+# esquema da coleção; importável sem conectar (ex.: api/benchmark cria uma
+# cópia local com os mesmos vetores e índices)
+VECTORS_CONFIG = {
+    "dense": models.VectorParams(size=1024,
+                                 distance=models.Distance.COSINE,
+                                 on_disk=True),
+    "colbert": models.VectorParams(
+        size=128,
+        distance=models.Distance.COSINE,
+        multivector_config=models.MultiVectorConfig(
+            comparator=models.MultiVectorComparator.MAX_SIM
+        )
+    ),
+}
+SPARSE_VECTORS_CONFIG = {"sparse": models.SparseVectorParams()}
+QUANTIZATION_CONFIG = models.ScalarQuantization(
+    scalar=models.ScalarQuantizationConfig(
+        type=models.ScalarType.INT8,
+        quantile=0.99,
+        always_ram=True
+    )
 )
 
-# Usado em testes iniciais para recriar a colecao do zero.
-# Em producao, manter comentado para nao apagar dados indexados.
-# qdrant.delete_collection(COLLECTION_NAME)
-
-if not qdrant.collection_exists(COLLECTION_NAME):
-    qdrant.create_collection(
-        collection_name=COLLECTION_NAME,
-        vectors_config={
-            "dense": models.VectorParams(size=1024,
-                                         distance=models.Distance.COSINE,
-                                         on_disk=True),
-            "colbert": models.VectorParams(
-                size=128,
-                distance=models.Distance.COSINE,
-                multivector_config=models.MultiVectorConfig(
-                    comparator=models.MultiVectorComparator.MAX_SIM
-                )
-            ),
-        },
-        sparse_vectors_config={"sparse": models.SparseVectorParams()},
-        quantization_config=models.ScalarQuantization(
-            scalar=models.ScalarQuantizationConfig(
-                type=models.ScalarType.INT8,
-                quantile=0.99,
-                always_ram=True
-            )
-        )
-    )
-else:
-    print(f"Colecao '{COLLECTION_NAME}' ja existe. Mantendo dados atuais.")
-
-
 fields_to_index = [
     ("metadata.document_id", models.PayloadSchemaType.KEYWORD),
     ("metadata.titulo", models.PayloadSchemaType.TEXT),
@@ -54,10 +37,34 @@ fields_to_index = [
     ("metadata.link_pdf", models.PayloadSchemaType.TEXT),
 ]
 
-for field_name, schema in fields_to_index:
-    qdrant.create_payload_index(
-        collection_name=COLLECTION_NAME,
-        field_name=field_name,
-        field_schema=schema,
-    )
-    print(f"Índice criado para {field_name}")
+
+def main():
+    load_dotenv()
+
+    qdrant = get_qdrant_client(QdrantConfig.from_env(timeout=120))
+
+    # Usado em testes iniciais para recriar a colecao do zero.
+    # Em producao, manter comentado para nao apagar dados indexados.
+    # qdrant.delete_collection(COLLECTION_NAME)
+
+    if not qdrant.collection_exists(COLLECTION_NAME):
+        qdrant.create_collection(
+            collection_name=COLLECTION_NAME,
+            vectors_config=VECTORS_CONFIG,
+            sparse_vectors_config=SPARSE_VECTORS_CONFIG,
+            quantization_config=QUANTIZATION_CONFIG,
+        )
+    else:
+        print(f"Colecao '{COLLECTION_NAME}' ja existe. Mantendo dados atuais.")
+
+    for field_name, schema in fields_to_index:
+        qdrant.create_payload_index(
+            collection_name=COLLECTION_NAME,
+            field_name=field_name,
+            field_schema=schema,
+        )
+        print(f"Índice criado para {field_name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,5 @@
 import os
+import time
 import uuid
 from pathlib import Path
 
@@ -12,18 +13,20 @@ import torch
 import pymupdf
 
 from dotenv import load_dotenv
-from qdrant_client import QdrantClient, models
-from fastembed import TextEmbedding, SparseTextEmbedding, LateInteractionTextEmbedding
+from qdrant_client import models
 
 from docling.datamodel.base_models import InputFormat
 from docling.datamodel.pipeline_options import PdfPipelineOptions, EasyOcrOptions
 from docling.datamodel.accelerator_options import AcceleratorDevice, AcceleratorOptions
 from docling.document_converter import DocumentConverter, PdfFormatOption
 from docling_core.transforms.chunker.tokenizer.huggingface import HuggingFaceTokenizer
-from transformers import AutoTokenizer
 
 from ingestao.utils.clean_itens import baixar_pdf_real
+from ingestao.utils.semantic_chunker import SemanticChunker
 from ingestao.db.banco_metadados import MetadataDB
+from shared.collection_version import bump_collection_version
+from shared.model_registry import model_registry
+from shared.qdrant import QdrantConfig, get_qdrant_client
 
 
 # ======================================
@@ -40,19 +43,25 @@ COLLECTION_NAME = "publicacoes_ipea"
 
 MAX_TOKENS = 600
 
-qdrant = QdrantClient(
-    url=os.getenv("QDRANT_URL"),
-    api_key=os.getenv("QDRANT_API_KEY"),
-    timeout=120,
-)
+# "hybrid" (HybridChunker do docling) ou "semantic" (SemanticChunker)
+CHUNKER = os.getenv("CHUNKER", "hybrid")
+# no modo semantic, usa a média dos vetores dos parágrafos como vetor denso
+# do chunk em vez de reembedar o chunk inteiro
+VETORES_AGRUPADOS = os.getenv("VETORES_AGRUPADOS", "false").lower() == "true"
+# parágrafos por janela de clusterização (limita memória em livros)
+SEMANTIC_WINDOW_SIZE = int(os.getenv("SEMANTIC_WINDOW_SIZE", "200"))
+
+# upserts grandes (ColBERT): timeout maior que o padrão da API
+qdrant = get_qdrant_client(QdrantConfig.from_env(timeout=120))
 
 print(qdrant.get_collections())
 
-dense_model = TextEmbedding(DENSE_MODEL)
-sparse_model = SparseTextEmbedding(SPARSE_MODEL)
-colbert_model = LateInteractionTextEmbedding(COLBERT_MODEL)
+model_registry.set_backend(os.getenv("EMBEDDING_BACKEND", model_registry.backend))
+dense_model = model_registry.dense(DENSE_MODEL)
+sparse_model = model_registry.sparse(SPARSE_MODEL)
+colbert_model = model_registry.colbert(COLBERT_MODEL)
 
-hf_tokenizer = AutoTokenizer.from_pretrained(DENSE_MODEL)
+hf_tokenizer = model_registry.tokenizer(DENSE_MODEL)
 
 tokenizer_chunker = HuggingFaceTokenizer(
     tokenizer=hf_tokenizer,
@@ -60,6 +69,16 @@ tokenizer_chunker = HuggingFaceTokenizer(
 )
 db_metadata = MetadataDB()
 
+semantic_chunker = (
+    SemanticChunker(model_name=DENSE_MODEL, window_size=SEMANTIC_WINDOW_SIZE)
+    if CHUNKER == "semantic"
+    else None
+)
+
+for modelo in model_registry.memory_report():
+    print(f"[MODELO] {modelo['kind']} {modelo['name']} ({modelo['backend']}): "
+          f"{modelo['rss_delta_bytes'] / 2**20:.0f} MiB")
+
 LOG_DIR = Path(__file__).resolve().parent / "logs"
 LOG_DIR.mkdir(parents=True, exist_ok=True)
 
@@ -199,6 +218,8 @@ def processar_documento(metadata: dict) -> bool:
         db_metadata.atualizar_status(doc_id, "processado")
         return True
 
+    inicio = time.perf_counter()
+
     try:
         db_metadata.atualizar_status(doc_id, "em processamento")
 
@@ -216,22 +237,31 @@ def processar_documento(metadata: dict) -> bool:
             db_metadata.atualizar_status(doc_id, "erro")
             return True
 
-        chunker = HybridChunker(
-            tokenizer=tokenizer_chunker,
-            max_tokens=MAX_TOKENS,
-            merge_peers=True
-        )
+        if semantic_chunker is not None:
+            texto = "\n\n".join(doc.export_to_markdown() for doc in documentos_parciais)
+            if VETORES_AGRUPADOS:
+                chunks = semantic_chunker.create_chunks_with_embeddings(texto)
+            else:
+                chunks = [(c, None) for c in semantic_chunker.create_chunks(texto)]
+        else:
+            chunker = HybridChunker(
+                tokenizer=tokenizer_chunker,
+                max_tokens=MAX_TOKENS,
+                merge_peers=True
+            )
 
-        chunks = []
-        for doc in documentos_parciais:
-            chunks.extend(chunker.chunk(doc))
+            chunks = []
+            for doc in documentos_parciais:
+                chunks.extend((chunk.text, None) for chunk in chunker.chunk(doc))
 
         points = []
         BATCH_SIZE = 8
+        num_chunks = 0
+        num_tokens = 0
 
-        for idx, chunk in tqdm(enumerate(chunks), total=len(chunks)):
+        for idx, (text_chunk, dense_vector) in tqdm(enumerate(chunks), total=len(chunks)):
 
-            text_chunk = chunk.text.strip()
+            text_chunk = text_chunk.strip()
 
             if not text_chunk:
                 continue
@@ -247,6 +277,9 @@ def processar_documento(metadata: dict) -> bool:
                 tokens = tokens[:MAX_TOKENS]
                 text_chunk = hf_tokenizer.decode(tokens)
 
+            num_chunks += 1
+            num_tokens += len(tokens)
+
             # 🔥 ColBERT safety (128 tokens ideal)
             colbert_tokens = hf_tokenizer(
                 text_chunk,
@@ -261,9 +294,10 @@ def processar_documento(metadata: dict) -> bool:
             # Embeddings
             # ==========================
 
-            dense_embedding = list(
-                dense_model.passage_embed([text_chunk])
-            )[0].tolist()
+            if dense_vector is not None:
+                dense_embedding = dense_vector.tolist()
+            else:
+                dense_embedding = dense_model.embed_documents([text_chunk])[0].tolist()
 
             sparse_embedding = list(
                 sparse_model.passage_embed([text_chunk])
@@ -321,7 +355,19 @@ def processar_documento(metadata: dict) -> bool:
                 wait=True,
             )
 
+        if num_chunks:
+            # invalida os caches de busca da API
+            bump_collection_version(qdrant, COLLECTION_NAME)
+
         db_metadata.atualizar_status(doc_id, "processado")
+        db_metadata.registrar_estatisticas(doc_id, {
+            "num_paginas": sum(len(doc.pages) for doc in documentos_parciais),
+            "num_blocos": len(documentos_parciais),
+            "num_chunks": num_chunks,
+            "num_tokens": num_tokens,
+            "duracao_s": round(time.perf_counter() - inicio, 3),
+            "data_processamento": datetime.now(timezone.utc).isoformat(),
+        })
 
         print(f"[OK] Documento {doc_id} processado.\n")
         return True
@@ -361,12 +407,9 @@ elif interesse:
 elif autor:
     documentos = db_metadata.buscar_pendentes_por_autor(autor)
 else:
-    documentos = []
-    while True:
-        metadata = db_metadata.buscar_pendente()
-        if not metadata:
-            break
-        documentos.append(metadata)
+    documentos = db_metadata.buscar_pendentes()
+
+print(f"Progresso atual: {db_metadata.resumo_progresso()['status_ingestao']}")
 
 if not documentos:
     print("Nenhum documento pendente encontrado para os filtros informados.")
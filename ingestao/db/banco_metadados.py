@@ -4,6 +4,22 @@ from typing import Any, Dict, Optional
 
 DB_PATH = Path(__file__).resolve().parents[2] / "data" / "banco1.db"
 
+def termo_fts(texto: str | None) -> Optional[str]:
+    """
+    Converte texto livre em uma consulta FTS5 segura.
+
+    O texto vira uma frase entre aspas com prefixo no último termo, o que
+    preserva a semântica aproximada do antigo LIKE '%x%' ("intelig"
+    encontra "inteligência") sem interpretar operadores digitados pelo
+    usuário. Retorna None quando não há termos.
+
+    Usada pelo MetadataDB e pelo catálogo da API (api/services/catalog.py),
+    que consultam o mesmo índice documentos_fts.
+    """
+    if texto is None or not texto.strip():
+        return None
+    return '"' + texto.strip().replace('"', '""') + '"*'
+
 class MetadataDB:
     """
     Wrapper simples em torno de um banco SQLite para metadados de documentos.
@@ -12,7 +28,8 @@ class MetadataDB:
     - conectar -> abre conexão
     - criar_tabela -> cria a tabela principal
     - inserir_documento, buscar_documento, atualizar_documento
-    - buscar_pendente, atualizar_status
+    - buscar_pendente, buscar_pendentes, atualizar_status
+    - resumo_progresso, contar_por_status (contagens materializadas)
     """
 
     def __init__(self, db_path: Path | str = DB_PATH) -> None:
@@ -24,6 +41,9 @@ class MetadataDB:
         """Abre uma conexão com row_factory configurado para sqlite3.Row."""
         conn = sqlite3.connect(self.db_path)
         conn.row_factory = sqlite3.Row
+        # Sem isso o INSERT OR REPLACE não dispara os triggers de DELETE
+        # e o índice FTS fica com entradas órfãs.
+        conn.execute("PRAGMA recursive_triggers = ON")
         return conn
 
     def criar_tabela(self) -> None:
@@ -47,6 +67,303 @@ class MetadataDB:
             """)
             conn.commit()
 
+        self.criar_tabela_estatisticas()
+        self.criar_indices()
+        self.criar_indice_fts()
+        self.criar_resumo_progresso()
+
+    def criar_tabela_estatisticas(self) -> None:
+        """Cria a tabela 'estatisticas_processamento' (uma linha por documento processado)."""
+        with self.conectar() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS estatisticas_processamento (
+                    document_id TEXT PRIMARY KEY,
+                    num_paginas INTEGER,
+                    num_blocos INTEGER,
+                    num_chunks INTEGER,
+                    num_tokens INTEGER,
+                    duracao_s REAL,
+                    data_processamento TEXT
+                );
+            """)
+            conn.commit()
+
+    def criar_indices(self) -> None:
+        """
+        Cria os índices secundários usados pelas consultas de progresso.
+
+        O índice (status_ingestao, id) cobre o filtro por status e a ordenação
+        por id de buscar_pendente, sem ordenar a tabela inteira. Os índices
+        de catálogo cobrem a paginação por cursor do catálogo da API
+        (api/services/catalog.py) ordenada por ano ou título; as expressões
+        COALESCE precisam ser idênticas às usadas nas consultas.
+        """
+        with self.conectar() as conn:
+            cursor = conn.cursor()
+            cursor.executescript("""
+                CREATE INDEX IF NOT EXISTS idx_documentos_status
+                    ON documentos (status_ingestao, id);
+                CREATE INDEX IF NOT EXISTS idx_documentos_ano
+                    ON documentos (ano);
+                CREATE INDEX IF NOT EXISTS idx_documentos_tipo
+                    ON documentos (tipo_conteudo);
+                CREATE INDEX IF NOT EXISTS idx_documentos_catalogo_ano
+                    ON documentos (status_ingestao, COALESCE(ano, -1), id);
+                CREATE INDEX IF NOT EXISTS idx_documentos_catalogo_titulo
+                    ON documentos (status_ingestao, COALESCE(titulo, ''), id);
+            """)
+            conn.commit()
+
+    def criar_resumo_progresso(self) -> None:
+        """
+        Cria a tabela 'documentos_resumo' com contagens por status, ano e
+        tipo_conteudo, mantida incrementalmente por triggers.
+
+        Cada linha é (dimensao, valor, total); valores nulos são gravados como ''.
+        """
+        with self.conectar() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT 1 FROM sqlite_master
+                WHERE type = 'table' AND name = 'documentos_resumo'
+            """)
+            ja_existia = cursor.fetchone() is not None
+
+            cursor.executescript("""
+                CREATE TABLE IF NOT EXISTS documentos_resumo (
+                    dimensao TEXT NOT NULL,
+                    valor TEXT NOT NULL,
+                    total INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY (dimensao, valor)
+                ) WITHOUT ROWID;
+
+                CREATE TRIGGER IF NOT EXISTS documentos_resumo_ai
+                AFTER INSERT ON documentos BEGIN
+                    INSERT INTO documentos_resumo (dimensao, valor, total)
+                    VALUES ('status_ingestao', COALESCE(new.status_ingestao, ''), 1)
+                    ON CONFLICT (dimensao, valor) DO UPDATE SET total = total + 1;
+                    INSERT INTO documentos_resumo (dimensao, valor, total)
+                    VALUES ('ano', COALESCE(CAST(new.ano AS TEXT), ''), 1)
+                    ON CONFLICT (dimensao, valor) DO UPDATE SET total = total + 1;
+                    INSERT INTO documentos_resumo (dimensao, valor, total)
+                    VALUES ('tipo_conteudo', COALESCE(new.tipo_conteudo, ''), 1)
+                    ON CONFLICT (dimensao, valor) DO UPDATE SET total = total + 1;
+                END;
+
+                CREATE TRIGGER IF NOT EXISTS documentos_resumo_ad
+                AFTER DELETE ON documentos BEGIN
+                    UPDATE documentos_resumo SET total = total - 1
+                    WHERE dimensao = 'status_ingestao'
+                      AND valor = COALESCE(old.status_ingestao, '');
+                    UPDATE documentos_resumo SET total = total - 1
+                    WHERE dimensao = 'ano'
+                      AND valor = COALESCE(CAST(old.ano AS TEXT), '');
+                    UPDATE documentos_resumo SET total = total - 1
+                    WHERE dimensao = 'tipo_conteudo'
+                      AND valor = COALESCE(old.tipo_conteudo, '');
+                END;
+
+                CREATE TRIGGER IF NOT EXISTS documentos_resumo_au_status
+                AFTER UPDATE OF status_ingestao ON documentos
+                WHEN old.status_ingestao IS NOT new.status_ingestao BEGIN
+                    UPDATE documentos_resumo SET total = total - 1
+                    WHERE dimensao = 'status_ingestao'
+                      AND valor = COALESCE(old.status_ingestao, '');
+                    INSERT INTO documentos_resumo (dimensao, valor, total)
+                    VALUES ('status_ingestao', COALESCE(new.status_ingestao, ''), 1)
+                    ON CONFLICT (dimensao, valor) DO UPDATE SET total = total + 1;
+                END;
+
+                CREATE TRIGGER IF NOT EXISTS documentos_resumo_au_ano
+                AFTER UPDATE OF ano ON documentos
+                WHEN old.ano IS NOT new.ano BEGIN
+                    UPDATE documentos_resumo SET total = total - 1
+                    WHERE dimensao = 'ano'
+                      AND valor = COALESCE(CAST(old.ano AS TEXT), '');
+                    INSERT INTO documentos_resumo (dimensao, valor, total)
+                    VALUES ('ano', COALESCE(CAST(new.ano AS TEXT), ''), 1)
+                    ON CONFLICT (dimensao, valor) DO UPDATE SET total = total + 1;
+                END;
+
+                CREATE TRIGGER IF NOT EXISTS documentos_resumo_au_tipo
+                AFTER UPDATE OF tipo_conteudo ON documentos
+                WHEN old.tipo_conteudo IS NOT new.tipo_conteudo BEGIN
+                    UPDATE documentos_resumo SET total = total - 1
+                    WHERE dimensao = 'tipo_conteudo'
+                      AND valor = COALESCE(old.tipo_conteudo, '');
+                    INSERT INTO documentos_resumo (dimensao, valor, total)
+                    VALUES ('tipo_conteudo', COALESCE(new.tipo_conteudo, ''), 1)
+                    ON CONFLICT (dimensao, valor) DO UPDATE SET total = total + 1;
+                END;
+            """)
+            conn.commit()
+
+        if not ja_existia:
+            self.reconstruir_resumo_progresso()
+
+    def reconstruir_resumo_progresso(self) -> None:
+        """Recalcula 'documentos_resumo' do zero a partir de 'documentos'."""
+        with self.conectar() as conn:
+            cursor = conn.cursor()
+            cursor.execute("DELETE FROM documentos_resumo")
+            cursor.execute("""
+                INSERT INTO documentos_resumo (dimensao, valor, total)
+                SELECT 'status_ingestao', COALESCE(status_ingestao, ''), COUNT(*)
+                FROM documentos GROUP BY 2
+                UNION ALL
+                SELECT 'ano', COALESCE(CAST(ano AS TEXT), ''), COUNT(*)
+                FROM documentos GROUP BY 2
+                UNION ALL
+                SELECT 'tipo_conteudo', COALESCE(tipo_conteudo, ''), COUNT(*)
+                FROM documentos GROUP BY 2
+            """)
+            conn.commit()
+
+    def resumo_progresso(self) -> Dict[str, Dict[str, int]]:
+        """
+        Retorna as contagens materializadas por dimensão, por exemplo:
+        {"status_ingestao": {"pendente": 10, ...}, "ano": {...}, "tipo_conteudo": {...}}.
+
+        Custa O(número de valores distintos), não O(tabela).
+        """
+        resumo: Dict[str, Dict[str, int]] = {
+            "status_ingestao": {},
+            "ano": {},
+            "tipo_conteudo": {},
+        }
+        with self.conectar() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT dimensao, valor, total
+                FROM documentos_resumo
+                WHERE total > 0
+                ORDER BY dimensao, valor
+            """)
+            for row in cursor.fetchall():
+                resumo.setdefault(row["dimensao"], {})[row["valor"]] = row["total"]
+        return resumo
+
+    def contar_por_status(self, status: str) -> int:
+        """Número de documentos com o status informado, lido do resumo materializado."""
+        with self.conectar() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT total FROM documentos_resumo
+                WHERE dimensao = 'status_ingestao' AND valor = ?
+            """, (status,))
+            row = cursor.fetchone()
+        return row["total"] if row else 0
+
+    def criar_indice_fts(self) -> None:
+        """
+        Cria a tabela virtual FTS5 'documentos_fts' e os triggers que a mantêm
+        sincronizada com 'documentos'.
+
+        A tabela usa 'documentos' como conteúdo externo (não duplica o texto)
+        e o tokenizer unicode61 com remove_diacritics, de modo que
+        "inteligencia" encontra "inteligência".
+        """
+        with self.conectar() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT 1 FROM sqlite_master
+                WHERE type = 'table' AND name = 'documentos_fts'
+            """)
+            ja_existia = cursor.fetchone() is not None
+
+            cursor.executescript("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS documentos_fts USING fts5(
+                    titulo,
+                    resumo,
+                    palavras_chave,
+                    autores,
+                    content = 'documentos',
+                    content_rowid = 'rowid',
+                    tokenize = 'unicode61 remove_diacritics 2'
+                );
+
+                CREATE TRIGGER IF NOT EXISTS documentos_fts_ai
+                AFTER INSERT ON documentos BEGIN
+                    INSERT INTO documentos_fts (rowid, titulo, resumo, palavras_chave, autores)
+                    VALUES (new.rowid, new.titulo, new.resumo, new.palavras_chave, new.autores);
+                END;
+
+                CREATE TRIGGER IF NOT EXISTS documentos_fts_ad
+                AFTER DELETE ON documentos BEGIN
+                    INSERT INTO documentos_fts (documentos_fts, rowid, titulo, resumo, palavras_chave, autores)
+                    VALUES ('delete', old.rowid, old.titulo, old.resumo, old.palavras_chave, old.autores);
+                END;
+
+                CREATE TRIGGER IF NOT EXISTS documentos_fts_au
+                AFTER UPDATE OF titulo, resumo, palavras_chave, autores ON documentos BEGIN
+                    INSERT INTO documentos_fts (documentos_fts, rowid, titulo, resumo, palavras_chave, autores)
+                    VALUES ('delete', old.rowid, old.titulo, old.resumo, old.palavras_chave, old.autores);
+                    INSERT INTO documentos_fts (rowid, titulo, resumo, palavras_chave, autores)
+                    VALUES (new.rowid, new.titulo, new.resumo, new.palavras_chave, new.autores);
+                END;
+            """)
+            conn.commit()
+
+        if not ja_existia:
+            # bancos criados antes do índice: popula a partir das linhas atuais
+            self.reconstruir_indice_fts()
+
+    def reconstruir_indice_fts(self) -> None:
+        """
+        Reconstrói o índice FTS a partir de 'documentos'.
+
+        Necessário após um VACUUM, que pode renumerar os rowids da tabela.
+        """
+        with self.conectar() as conn:
+            conn.execute("INSERT INTO documentos_fts (documentos_fts) VALUES ('rebuild')")
+            conn.commit()
+
+    def _buscar_fts(
+        self,
+        interesse: str | None = None,
+        autor: str | None = None,
+        apenas_pendentes: bool = False,
+    ):
+        """
+        Busca ranqueada (bm25) sobre 'documentos_fts'.
+
+        'interesse' é procurado em titulo, resumo e palavras_chave;
+        'autor' apenas em autores. Sem termos, lista todos os documentos.
+        """
+        expressoes = []
+        termo_interesse = termo_fts(interesse)
+        if termo_interesse:
+            expressoes.append(f"{{titulo resumo palavras_chave}} : {termo_interesse}")
+        termo_autor = termo_fts(autor)
+        if termo_autor:
+            expressoes.append(f"autores : {termo_autor}")
+
+        with self.conectar() as conn:
+            cursor = conn.cursor()
+
+            if not expressoes:
+                query = "SELECT * FROM documentos"
+                if apenas_pendentes:
+                    query += " WHERE status_ingestao = 'pendente'"
+                query += " ORDER BY id ASC"
+                cursor.execute(query)
+                return [dict(r) for r in cursor.fetchall()]
+
+            # pesos do bm25 na ordem das colunas: titulo, resumo, palavras_chave, autores
+            query = """
+                SELECT d.*
+                FROM documentos_fts
+                JOIN documentos d ON d.rowid = documentos_fts.rowid
+                WHERE documentos_fts MATCH ?
+            """
+            if apenas_pendentes:
+                query += " AND d.status_ingestao = 'pendente'"
+            query += " ORDER BY bm25(documentos_fts, 10.0, 1.0, 5.0, 1.0), d.id ASC"
+
+            cursor.execute(query, (" AND ".join(expressoes),))
+            return [dict(r) for r in cursor.fetchall()]
+
     def remover_duplicatas(self) -> int:
         """
         Remove documentos duplicados com base em (titulo, ano, resumo).
@@ -186,6 +503,25 @@ class MetadataDB:
             row = cursor.fetchone()
             return dict(row) if row else None
 
+    def buscar_pendentes(self, limit: Optional[int] = None):
+        """
+        Lista documentos pendentes em ordem de id, percorrendo o índice de status.
+        """
+        with self.conectar() as conn:
+            cursor = conn.cursor()
+            query = """
+                SELECT *
+                FROM documentos
+                WHERE status_ingestao = 'pendente'
+                ORDER BY id ASC
+            """
+            params: tuple = ()
+            if limit is not None:
+                query += " LIMIT ?"
+                params = (limit,)
+            cursor.execute(query, params)
+            return [dict(r) for r in cursor.fetchall()]
+
     def atualizar_status(self, id: str, status: str) -> None:
         """Atualiza apenas o status_ingestao do documento."""
         with self.conectar() as conn:
@@ -197,6 +533,27 @@ class MetadataDB:
             """, (status, id))
             conn.commit()
 
+    def registrar_estatisticas(self, document_id: str, estatisticas: Dict[str, Any]) -> None:
+        """Insere ou substitui as estatísticas de processamento de um documento."""
+        with self.conectar() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                INSERT OR REPLACE INTO estatisticas_processamento (
+                    document_id, num_paginas, num_blocos, num_chunks,
+                    num_tokens, duracao_s, data_processamento
+                )
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, (
+                document_id,
+                estatisticas.get("num_paginas"),
+                estatisticas.get("num_blocos"),
+                estatisticas.get("num_chunks"),
+                estatisticas.get("num_tokens"),
+                estatisticas.get("duracao_s"),
+                estatisticas.get("data_processamento"),
+            ))
+            conn.commit()
+
     def atualizar_link_donwload(self, id: str, link_download: str) -> None:
         """Atualiza apenas o status_ingestao do documento."""
         with self.conectar() as conn:
@@ -218,43 +575,13 @@ class MetadataDB:
             return [dict(r) for r in cursor.fetchall()]
 
     def buscar_pendentes_por_autor(self, autor: str):
-        with self.conectar() as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                SELECT *
-                FROM documentos
-                WHERE LOWER(autores) LIKE LOWER(?)
-                  AND status_ingestao = 'pendente'
-                ORDER BY id ASC
-            """, (f"%{autor}%",))
-            return [dict(r) for r in cursor.fetchall()]
+        return self._buscar_fts(autor=autor, apenas_pendentes=True)
 
     def buscar_autor(self, autor: str):
-        with self.conectar() as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                SELECT * FROM documentos
-                WHERE LOWER(autores) LIKE LOWER(?)
-            """, (f"%{autor}%",))
-            return [dict(r) for r in cursor.fetchall()]
+        return self._buscar_fts(autor=autor)
 
     def buscar_interesse(self, interesse: str, apenas_pendentes: bool = True):
-        with self.conectar() as conn:
-            cursor = conn.cursor()
-            query = """
-                SELECT * FROM documentos
-                WHERE (
-                    LOWER(titulo) LIKE LOWER(?)
-                    OR LOWER(resumo) LIKE LOWER(?)
-                    OR LOWER(palavras_chave) LIKE LOWER(?)
-                )
-            """
-            params = (f"%{interesse}%", f"%{interesse}%", f"%{interesse}%")
-            if apenas_pendentes:
-                query += " AND status_ingestao = 'pendente'"
-            query += " ORDER BY id ASC"
-            cursor.execute(query, params)
-            return [dict(r) for r in cursor.fetchall()]
+        return self._buscar_fts(interesse=interesse, apenas_pendentes=apenas_pendentes)
 
     def buscar_interesse_autor(
         self,
@@ -262,25 +589,8 @@ class MetadataDB:
         autor: str,
         apenas_pendentes: bool = True,
     ):
-        with self.conectar() as conn:
-            cursor = conn.cursor()
-            query = """
-                SELECT * FROM documentos
-                WHERE (
-                    LOWER(titulo) LIKE LOWER(?)
-                    OR LOWER(resumo) LIKE LOWER(?)
-                    OR LOWER(palavras_chave) LIKE LOWER(?)
-                )
-                  AND LOWER(autores) LIKE LOWER(?)
-            """
-            params = (
-                f"%{interesse}%",
-                f"%{interesse}%",
-                f"%{interesse}%",
-                f"%{autor}%",
-            )
-            if apenas_pendentes:
-                query += " AND status_ingestao = 'pendente'"
-            query += " ORDER BY id ASC"
-            cursor.execute(query, params)
-            return [dict(r) for r in cursor.fetchall()]
+        return self._buscar_fts(
+            interesse=interesse,
+            autor=autor,
+            apenas_pendentes=apenas_pendentes,
+        )
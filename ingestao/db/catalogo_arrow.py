@@ -0,0 +1,206 @@
+"""
+Exportação e importação colunar do catálogo de metadados (Parquet / Arrow IPC).
+
+Os dados são lidos do SQLite com fetchmany e escritos em record batches, e a
+importação lê o arquivo lote a lote, de modo que a memória fica limitada ao
+tamanho de um lote independentemente do tamanho do catálogo.
+
+Uso:
+    python -m ingestao.db.catalogo_arrow exportar data/snapshot
+    python -m ingestao.db.catalogo_arrow importar data/snapshot --formato arrow
+"""
+import argparse
+from pathlib import Path
+from typing import Dict, Iterator
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from ingestao.db.banco_metadados import MetadataDB
+
+BATCH_SIZE = 10_000
+
+SCHEMAS: Dict[str, pa.Schema] = {
+    "documentos": pa.schema([
+        ("id", pa.string()),
+        ("titulo", pa.string()),
+        ("autores", pa.string()),
+        ("ano", pa.int32()),
+        ("tipo_conteudo", pa.string()),
+        ("resumo", pa.string()),
+        ("palavras_chave", pa.string()),
+        ("link_pdf", pa.string()),
+        ("link_download", pa.string()),
+        ("status_ingestao", pa.string()),
+        ("data_ingestao", pa.string()),
+    ]),
+    "estatisticas_processamento": pa.schema([
+        ("document_id", pa.string()),
+        ("num_paginas", pa.int32()),
+        ("num_blocos", pa.int32()),
+        ("num_chunks", pa.int32()),
+        ("num_tokens", pa.int64()),
+        ("duracao_s", pa.float64()),
+        ("data_processamento", pa.string()),
+    ]),
+}
+
+EXTENSOES = {"parquet": ".parquet", "arrow": ".arrow"}
+
+
+def _schema(tabela: str) -> pa.Schema:
+    if tabela not in SCHEMAS:
+        raise ValueError(f"Tabela desconhecida: {tabela!r}. Opções: {sorted(SCHEMAS)}")
+    return SCHEMAS[tabela]
+
+
+def _formato(caminho: Path) -> str:
+    if caminho.suffix in (".arrow", ".feather", ".ipc"):
+        return "arrow"
+    return "parquet"
+
+
+def iterar_lotes(
+    db: MetadataDB,
+    tabela: str,
+    batch_size: int = BATCH_SIZE,
+) -> Iterator[pa.RecordBatch]:
+    """Lê a tabela do SQLite em lotes e devolve cada lote como pa.RecordBatch."""
+    schema = _schema(tabela)
+    colunas = ", ".join(schema.names)
+
+    with db.conectar() as conn:
+        # tuplas simples: evita o custo de sqlite3.Row/dict por linha
+        conn.row_factory = None
+        cursor = conn.execute(f"SELECT {colunas} FROM {tabela} ORDER BY rowid")
+
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+
+            arrays = [
+                pa.array(valores, type=campo.type)
+                for valores, campo in zip(zip(*rows), schema)
+            ]
+            yield pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+def exportar_tabela(
+    db: MetadataDB,
+    tabela: str,
+    caminho: Path | str,
+    batch_size: int = BATCH_SIZE,
+) -> int:
+    """
+    Exporta uma tabela para Parquet ou Arrow IPC (definido pela extensão).
+    Retorna o número de linhas escritas.
+    """
+    caminho = Path(caminho)
+    caminho.parent.mkdir(parents=True, exist_ok=True)
+    schema = _schema(tabela)
+    total = 0
+
+    if _formato(caminho) == "arrow":
+        with pa.OSFile(str(caminho), "wb") as sink, pa.ipc.new_file(sink, schema) as writer:
+            for batch in iterar_lotes(db, tabela, batch_size):
+                writer.write_batch(batch)
+                total += batch.num_rows
+    else:
+        with pq.ParquetWriter(caminho, schema, compression="zstd") as writer:
+            for batch in iterar_lotes(db, tabela, batch_size):
+                writer.write_batch(batch)
+                total += batch.num_rows
+
+    return total
+
+
+def _ler_lotes(caminho: Path, schema: pa.Schema, batch_size: int) -> Iterator[pa.RecordBatch]:
+    if _formato(caminho) == "arrow":
+        with pa.memory_map(str(caminho), "r") as source:
+            reader = pa.ipc.open_file(source)
+            for i in range(reader.num_record_batches):
+                yield reader.get_batch(i).select(schema.names)
+    else:
+        arquivo = pq.ParquetFile(caminho)
+        yield from arquivo.iter_batches(batch_size=batch_size, columns=schema.names)
+
+
+def importar_tabela(
+    db: MetadataDB,
+    tabela: str,
+    caminho: Path | str,
+    batch_size: int = BATCH_SIZE,
+) -> int:
+    """
+    Importa um arquivo Parquet/Arrow para a tabela com INSERT OR REPLACE.
+
+    Os triggers do FTS e do resumo de progresso continuam valendo, então os
+    índices derivados ficam consistentes ao final. Retorna o número de linhas lidas.
+    """
+    caminho = Path(caminho)
+    schema = _schema(tabela)
+    colunas = ", ".join(schema.names)
+    marcadores = ", ".join("?" * len(schema.names))
+    total = 0
+
+    with db.conectar() as conn:
+        cursor = conn.cursor()
+        for batch in _ler_lotes(caminho, schema, batch_size):
+            rows = zip(*(coluna.to_pylist() for coluna in batch.columns))
+            cursor.executemany(
+                f"INSERT OR REPLACE INTO {tabela} ({colunas}) VALUES ({marcadores})",
+                rows,
+            )
+            total += batch.num_rows
+        conn.commit()
+
+    return total
+
+
+def exportar_catalogo(
+    db: MetadataDB,
+    diretorio: Path | str,
+    formato: str = "parquet",
+    batch_size: int = BATCH_SIZE,
+) -> Dict[str, int]:
+    """Exporta todas as tabelas do catálogo para `diretorio/<tabela>.<formato>`."""
+    diretorio = Path(diretorio)
+    return {
+        tabela: exportar_tabela(db, tabela, diretorio / f"{tabela}{EXTENSOES[formato]}", batch_size)
+        for tabela in SCHEMAS
+    }
+
+
+def importar_catalogo(
+    db: MetadataDB,
+    diretorio: Path | str,
+    formato: str = "parquet",
+    batch_size: int = BATCH_SIZE,
+) -> Dict[str, int]:
+    """Importa as tabelas presentes em `diretorio` (arquivos ausentes são ignorados)."""
+    diretorio = Path(diretorio)
+    resultado = {}
+    for tabela in SCHEMAS:
+        caminho = diretorio / f"{tabela}{EXTENSOES[formato]}"
+        if caminho.exists():
+            resultado[tabela] = importar_tabela(db, tabela, caminho, batch_size)
+    return resultado
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("acao", choices=["exportar", "importar"])
+    parser.add_argument("diretorio")
+    parser.add_argument("--formato", choices=sorted(EXTENSOES), default="parquet")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    args = parser.parse_args()
+
+    db_metadata = MetadataDB()
+    if args.acao == "exportar":
+        linhas = exportar_catalogo(db_metadata, args.diretorio, args.formato, args.batch_size)
+    else:
+        linhas = importar_catalogo(db_metadata, args.diretorio, args.formato, args.batch_size)
+
+    for tabela, total in linhas.items():
+        print(f"{tabela}: {total} linhas")
@@ -86,12 +86,12 @@ def teste_buscar_erros():
 def teste_estatisticas():
     print("\n=== TESTE: ESTATÍSTICAS GERAIS ===")
 
-    todos = metadata.buscar_autor("")  # busca tudo
-    total = len(todos)
+    status = metadata.resumo_progresso()["status_ingestao"]
+    total = sum(status.values())
 
-    processados = len([d for d in todos if d["status_ingestao"] == "processado"])
-    pendentes = len([d for d in todos if d["status_ingestao"] == "pendente"])
-    erros = len([d for d in todos if d["status_ingestao"] == "erro"])
+    processados = status.get("processado", 0)
+    pendentes = status.get("pendente", 0)
+    erros = status.get("erro", 0)
 
     print(f"Total documentos: {total}")
     print(f"Processados: {processados}")
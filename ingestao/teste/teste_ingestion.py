@@ -7,10 +7,11 @@ Objetivo:
 - Inserir pontos sintéticos (sem depender de PDF/Docling/FastEmbed)
 """
 
-import os
 import uuid
 from dotenv import load_dotenv
-from qdrant_client import QdrantClient, models
+from qdrant_client import models
+
+from shared.qdrant import QdrantConfig, get_qdrant_client
 
 load_dotenv()
 
@@ -31,11 +32,7 @@ def _sparse_vector() -> dict:
 
 def main() -> None:
 
-    client = QdrantClient(
-        url=os.getenv("QDRANT_URL"),
-        api_key=os.getenv("QDRANT_API_KEY"),
-        timeout=120
-    )
+    client = get_qdrant_client(QdrantConfig.from_env(timeout=120))
 
     point = models.PointStruct(
         id=str(uuid.uuid4()),
@@ -10,7 +10,9 @@ Objetivo:
 import os
 import uuid
 from dotenv import load_dotenv
-from qdrant_client import QdrantClient, models
+from qdrant_client import models
+
+from shared.qdrant import QdrantConfig, get_qdrant_client
 
 load_dotenv()
 
@@ -34,7 +36,7 @@ def main() -> None:
     if not qdrant_url:
         raise ValueError("QDRANT_URL não encontrado no ambiente/.env")
 
-    client = QdrantClient(url=qdrant_url)
+    client = get_qdrant_client(QdrantConfig.from_env())
 
     point = models.PointStruct(
         id=str(uuid.uuid4()),
@@ -3,33 +3,66 @@ import warnings
 from collections import defaultdict
 
 import hdbscan
-import torch
-from sentence_transformers import SentenceTransformer
+import numpy as np
+
+from shared.model_registry import model_registry
 
 warnings.simplefilter(action="ignore", category=FutureWarning)
 
 
 class SemanticChunker:
+    """
+    Agrupa parágrafos semanticamente próximos (HDBSCAN sobre embeddings) em
+    chunks de até max_tokens.
+
+    Com window_size definido, a clusterização é feita em janelas de
+    parágrafos consecutivos, o que limita memória e tempo do HDBSCAN
+    (quadrático no número de pontos) em documentos longos. Os embeddings dos
+    parágrafos são calculados uma única vez por chamada e reaproveitados na
+    segunda passada dos órfãos e no pooling dos vetores dos chunks.
+    """
+
     def __init__(
         self,
         model_name: str = "intfloat/multilingual-e5-large",
         min_cluster_size: int = 3,
         orphan_cluster_size: int = 2,
         max_tokens: int = 500,
+        window_size: int | None = None,
+        batch_size: int = 32,
     ):
-        device = "cuda" if torch.cuda.is_available() else "cpu"
-        self.model = SentenceTransformer(model_name, device=device)
-        self.model.max_seq_length = 500
+        # modelo e tokenizer compartilhados com o indexador (um carregamento por processo);
+        # os parágrafos já são cortados em max_tokens antes do encode
+        self.model = model_registry.dense(model_name)
+        self.tokenizer = model_registry.tokenizer(model_name)
         self.min_cluster_size = min_cluster_size
         self.orphan_cluster_size = orphan_cluster_size
         self.max_tokens = max_tokens
-        self.tokenizer = self.model.tokenizer
-
-    def _cluster_and_process(self, texts, min_size):
-        if len(texts) <= 1:
-            return texts, texts if len(texts) == 1 else texts[0]
-
-        embeddings = self.model.encode(texts, show_progress_bar=False)
+        self.window_size = window_size
+        self.batch_size = batch_size
+
+    def _embed(self, texts, cache: dict) -> np.ndarray:
+        """Embeddings de `texts`, calculando apenas os que ainda não estão no cache."""
+        missing = [t for t in dict.fromkeys(texts) if t not in cache]
+        if missing:
+            vectors = self.model.embed_documents(missing, batch_size=self.batch_size)
+            cache.update(zip(missing, vectors))
+        return np.stack([cache[t] for t in texts])
+
+    def _count_tokens(self, text: str, cache: dict) -> int:
+        if text not in cache:
+            cache[text] = len(self.tokenizer.tokenize(text, add_special_tokens=False))
+        return cache[text]
+
+    def _cluster_and_process(self, texts, min_size, embeddings_cache, tokens_cache):
+        """
+        Retorna (grupos, órfãos): grupos são listas de parágrafos que formam
+        um chunk; órfãos são os parágrafos sem cluster.
+        """
+        if len(texts) < max(2, min_size):
+            return [], list(texts)
+
+        embeddings = self._embed(texts, embeddings_cache)
 
         labels = hdbscan.HDBSCAN(
             min_cluster_size=min_size,
@@ -45,16 +78,16 @@ class SemanticChunker:
             else:
                 orphans.append(texts[i])
 
-        chunks = []
+        groups = []
 
         for cluster_paras in clusters.values():
             current_chunk = []
             current_tokens = 0
 
             for para in cluster_paras:
-                para_tokens = len(self.tokenizer.tokenize(para, add_special_tokens=False))
+                para_tokens = self._count_tokens(para, tokens_cache)
                 if current_tokens + para_tokens > self.max_tokens and current_chunk:
-                    chunks.append("\n\n".join(current_chunk))
+                    groups.append(current_chunk)
                     current_chunk = [para]
                     current_tokens = para_tokens
                 else:
@@ -62,9 +95,26 @@ class SemanticChunker:
                     current_tokens += para_tokens
 
             if current_chunk:
-                chunks.append("\n\n".join(current_chunk))
-
-        return chunks, orphans
+                groups.append(current_chunk)
+
+        return groups, orphans
+
+    def _cluster_windowed(self, texts, min_size, embeddings_cache, tokens_cache):
+        """_cluster_and_process aplicado a janelas de window_size parágrafos."""
+        if not self.window_size or len(texts) <= self.window_size:
+            return self._cluster_and_process(texts, min_size, embeddings_cache, tokens_cache)
+
+        groups, orphans = [], []
+        for start in range(0, len(texts), self.window_size):
+            window_groups, window_orphans = self._cluster_and_process(
+                texts[start:start + self.window_size],
+                min_size,
+                embeddings_cache,
+                tokens_cache,
+            )
+            groups.extend(window_groups)
+            orphans.extend(window_orphans)
+        return groups, orphans
 
     def _split_long_paragraph(self, paragraph: str):
         tokens = self.tokenizer.tokenize(paragraph, add_special_tokens=False)
@@ -80,8 +130,7 @@ class SemanticChunker:
 
         return chunks
 
-    def create_chunks(self, text_content: str):
-
+    def _paragraphs(self, text_content: str):
         raw_paragraphs = [
             p.strip().lower() for p in text_content.split("\n\n")
             if len(p.strip().split()) > 10
@@ -98,18 +147,61 @@ class SemanticChunker:
         for p in raw_paragraphs:
             paragraphs.extend(self._split_long_paragraph(p))
 
-        if not paragraphs:
-            return []
+        return paragraphs
 
-        final_chunks, orphans = self._cluster_and_process(paragraphs, self.min_cluster_size)
+    def _group_paragraphs(self, paragraphs, embeddings_cache, tokens_cache):
+        groups, orphans = self._cluster_windowed(
+            paragraphs, self.min_cluster_size, embeddings_cache, tokens_cache
+        )
 
         if len(orphans) > 1:
-            orphans_chunks, single_orphans = self._cluster_and_process(
-                orphans, self.orphan_cluster_size
+            orphan_groups, single_orphans = self._cluster_windowed(
+                orphans, self.orphan_cluster_size, embeddings_cache, tokens_cache
             )
-            final_chunks.extend(orphans_chunks)
-            final_chunks.extend(single_orphans)
+            groups.extend(orphan_groups)
+            groups.extend([o] for o in single_orphans)
         else:
-            final_chunks.extend(orphans)
+            groups.extend([o] for o in orphans)
+
+        return groups
+
+    def create_chunks(self, text_content: str):
+        paragraphs = self._paragraphs(text_content)
+        if not paragraphs:
+            return []
+
+        groups = self._group_paragraphs(paragraphs, {}, {})
+        return ["\n\n".join(group) for group in groups]
+
+    def create_chunks_with_embeddings(self, text_content: str):
+        """
+        Como create_chunks, mas retorna pares (chunk, vetor denso).
+
+        O vetor do chunk é a média dos vetores dos seus parágrafos, ponderada
+        pelo número de tokens e normalizada (L2). Permite ao indexador pular
+        a segunda passada do modelo denso sobre os chunks.
+        """
+        paragraphs = self._paragraphs(text_content)
+        if not paragraphs:
+            return []
+
+        embeddings_cache, tokens_cache = {}, {}
+        groups = self._group_paragraphs(paragraphs, embeddings_cache, tokens_cache)
+
+        # parágrafos que não passaram pelo HDBSCAN (documentos muito curtos)
+        self._embed(paragraphs, embeddings_cache)
+
+        results = []
+        for group in groups:
+            vectors = np.stack([embeddings_cache[p] for p in group])
+            weights = np.array(
+                [max(self._count_tokens(p, tokens_cache), 1) for p in group],
+                dtype=np.float32,
+            )
+            pooled = (vectors * weights[:, None]).sum(axis=0) / weights.sum()
+            norm = np.linalg.norm(pooled)
+            if norm > 0:
+                pooled = pooled / norm
+            results.append(("\n\n".join(group), pooled.astype(np.float32)))
 
-        return final_chunks
+        return results
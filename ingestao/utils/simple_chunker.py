@@ -1,12 +1,30 @@
-from transformers import AutoTokenizer
+from bisect import bisect_left
 import re
 
+from shared.model_registry import model_registry
+
+SENTENCE_BOUNDARY = re.compile(r'(?<=[.!?])\s+(?=[A-Z])')
+
+
 class SimpleChunker:
+    """
+    Chunker de fallback: parágrafos -> sentenças -> palavras, com limite de tokens.
+
+    O texto é tokenizado uma única vez (todos os parágrafos em um só lote, com
+    offset mapping). A partir daí, contar tokens de qualquer trecho é uma
+    busca binária nos offsets, e os cortes são feitos por aritmética de
+    índices, sem retokenizar o texto.
+    """
+
     def __init__(self,
                  model_name: str = "intfloat/multilingual-e5-large",
                  max_tokens: int = 500):
         self.max_tokens = max_tokens
-        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+        self.tokenizer = model_registry.tokenizer(model_name)
+        if not self.tokenizer.is_fast:
+            raise ValueError(
+                f"O tokenizer de {model_name!r} não é 'fast' e não fornece offset mapping."
+            )
 
     def count_tokens(self, text: str):
         return len(
@@ -18,53 +36,116 @@ class SimpleChunker:
         )
 
     def _split_sentences(self, text):
-        return re.split(r'(?<=[.!?])\s+(?=[A-Z])', text)
+        return SENTENCE_BOUNDARY.split(text)
 
-    def create_chunks(self, text_content: str):
+    @staticmethod
+    def _paragraph_spans(text: str):
+        """Intervalos (início, fim) dos parágrafos não vazios, já sem espaços nas bordas."""
+        spans = []
+        pos = 0
+        for part in text.split("\n\n"):
+            start, end = pos, pos + len(part)
+            pos = end + 2
 
-        paragraphs = []
+            stripped = part.strip()
+            if not stripped:
+                continue
 
-        raw_paragraphs = [p.strip() for p in text_content.split("\n\n") if p.strip()]
+            start += len(part) - len(part.lstrip())
+            spans.append((start, start + len(stripped)))
+        return spans
 
-        for p in raw_paragraphs:
-            if self.count_tokens(p) > self.max_tokens:
-                sentences = self._split_sentences(p)
-                paragraphs.extend(sentences)
-            else:
-                paragraphs.append(p)
+    @staticmethod
+    def _sentence_spans(text: str, start: int, end: int):
+        """Intervalos das sentenças dentro de text[start:end]."""
+        spans = []
+        pos = start
+        for sep in SENTENCE_BOUNDARY.finditer(text, start, end):
+            if sep.start() > pos:
+                spans.append((pos, sep.start()))
+            pos = sep.end()
+        if end > pos:
+            spans.append((pos, end))
+        return spans
+
+    def _split_by_words(self, text: str, starts, lo: int, hi: int, end: int):
+        """
+        Divide os tokens [lo, hi) em janelas de até max_tokens, cortando apenas
+        em tokens que iniciam uma palavra (precedidos de espaço).
+        """
+        pieces = []
+        i = lo
+        while i < hi:
+            j = min(i + self.max_tokens, hi)
+
+            if j < hi:
+                k = j
+                while k > i + 1 and not text[starts[k] - 1].isspace():
+                    k -= 1
+                # palavra maior que a janela inteira: corte no meio da palavra
+                if k > i + 1 or text[starts[k] - 1].isspace():
+                    j = k
+
+            piece_end = starts[j] if j < hi else end
+            piece = " ".join(text[starts[i]:piece_end].split())
+            if piece:
+                pieces.append(piece)
+            i = j
+
+        return pieces
+
+    def create_chunks(self, text_content: str):
+
+        paragraph_spans = self._paragraph_spans(text_content)
+        if not paragraph_spans:
+            return []
+
+        encoded = self.tokenizer(
+            [text_content[a:b] for a, b in paragraph_spans],
+            add_special_tokens=False,
+            truncation=False,
+            return_offsets_mapping=True,
+            verbose=False,
+        )
 
         chunks = []
         current_chunk = []
         current_tokens = 0
 
-        for para in paragraphs:
-            para_tokens = self.count_tokens(para)
+        def flush():
+            nonlocal current_chunk, current_tokens
+            if current_chunk:
+                chunks.append("\n\n".join(current_chunk))
+            current_chunk = []
+            current_tokens = 0
+
+        for (p_start, p_end), offsets in zip(paragraph_spans, encoded["offset_mapping"]):
+            # posições absolutas (no texto completo) do início de cada token
+            starts = [p_start + s for s, _ in offsets]
 
-            if para_tokens > self.max_tokens:
-                words = para.split()
-                temp = ""
+            if len(starts) > self.max_tokens:
+                units = self._sentence_spans(text_content, p_start, p_end)
+            else:
+                units = [(p_start, p_end)]
 
-                for w in words:
-                    candidate = f"{temp} {w}".strip()
-                    if self.count_tokens(candidate) > self.max_tokens:
-                        chunks.append(temp)
-                        temp = w
-                    else:
-                        temp = candidate
+            for u_start, u_end in units:
+                lo = bisect_left(starts, u_start)
+                hi = bisect_left(starts, u_end)
+                unit_tokens = hi - lo
 
-                if temp:
-                    chunks.append(temp)
-                continue
+                if unit_tokens > self.max_tokens:
+                    flush()
+                    chunks.extend(
+                        self._split_by_words(text_content, starts, lo, hi, u_end)
+                    )
+                    continue
 
-            if current_tokens + para_tokens > self.max_tokens:
-                chunks.append("\n\n".join(current_chunk))
-                current_chunk = [para]
-                current_tokens = para_tokens
-            else:
-                current_chunk.append(para)
-                current_tokens += para_tokens
+                if current_tokens + unit_tokens > self.max_tokens:
+                    flush()
+
+                current_chunk.append(text_content[u_start:u_end])
+                current_tokens += unit_tokens
 
-        if current_chunk:
-            chunks.append("\n\n".join(current_chunk))
+        flush()
 
         return chunks
@@ -0,0 +1,66 @@
+"""
+Versão de uma coleção do Qdrant, usada para invalidar caches de busca.
+
+A versão fica em uma coleção auxiliar "<coleção>__versao" com um único ponto
+sem vetores. A ingestão chama bump_collection_version depois de gravar
+pontos; a API lê a versão e a inclui na chave dos caches, de modo que
+publicações novas tornam as entradas antigas inalcançáveis.
+
+A versão é o instante da escrita em nanossegundos: cresce monotonicamente sem
+leitura prévia, então vários processos de ingestão podem incrementá-la sem
+coordenação.
+"""
+import time
+from datetime import datetime, timezone
+
+from qdrant_client import AsyncQdrantClient, QdrantClient, models
+
+VERSION_COLLECTION_SUFFIX = "__versao"
+VERSION_POINT_ID = 1
+UNVERSIONED = "0"
+
+
+def version_collection_name(collection_name: str) -> str:
+    return f"{collection_name}{VERSION_COLLECTION_SUFFIX}"
+
+
+def _version_point() -> models.PointStruct:
+    return models.PointStruct(
+        id=VERSION_POINT_ID,
+        vector={},
+        payload={
+            "versao": str(time.time_ns()),
+            "atualizado_em": datetime.now(timezone.utc).isoformat(),
+        },
+    )
+
+
+def bump_collection_version(qdrant: QdrantClient, collection_name: str) -> str:
+    """Grava uma nova versão para a coleção e a retorna."""
+    name = version_collection_name(collection_name)
+    if not qdrant.collection_exists(name):
+        qdrant.create_collection(collection_name=name, vectors_config={})
+
+    point = _version_point()
+    qdrant.upsert(collection_name=name, points=[point], wait=True)
+    return point.payload["versao"]
+
+
+def get_collection_version(qdrant: QdrantClient, collection_name: str) -> str:
+    """Versão atual da coleção, ou UNVERSIONED se ela nunca foi incrementada."""
+    name = version_collection_name(collection_name)
+    if not qdrant.collection_exists(name):
+        return UNVERSIONED
+
+    points = qdrant.retrieve(collection_name=name, ids=[VERSION_POINT_ID], with_payload=True)
+    return points[0].payload["versao"] if points else UNVERSIONED
+
+
+async def aget_collection_version(qdrant: AsyncQdrantClient, collection_name: str) -> str:
+    """Variante assíncrona de get_collection_version."""
+    name = version_collection_name(collection_name)
+    if not await qdrant.collection_exists(name):
+        return UNVERSIONED
+
+    points = await qdrant.retrieve(collection_name=name, ids=[VERSION_POINT_ID], with_payload=True)
+    return points[0].payload["versao"] if points else UNVERSIONED
@@ -0,0 +1,183 @@
+"""
+Registro de modelos compartilhado pelo processo.
+
+Tokenizers e encoders (denso, sparse/BM25 e ColBERT) são carregados uma única
+vez por processo e reaproveitados pelo chunker, pelo indexador e pela API.
+O modelo denso roda em um único backend, escolhido por EMBEDDING_BACKEND:
+
+- "fastembed": ONNX Runtime (padrão, mesmo backend dos modelos sparse/ColBERT)
+- "sentence-transformers": PyTorch, usa GPU quando disponível
+
+Os imports das bibliotecas de modelos são feitos sob demanda para que o
+backend não escolhido não seja carregado.
+"""
+import os
+import resource
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Tuple
+
+import numpy as np
+
+BACKENDS = ("fastembed", "sentence-transformers")
+
+
+def rss_bytes() -> int:
+    """RSS atual do processo (Linux); fora dele, usa o pico do getrusage."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+@dataclass
+class LoadedModel:
+    kind: str
+    name: str
+    backend: str
+    model: Any
+    rss_delta_bytes: int
+    load_seconds: float
+
+
+class DenseEncoder:
+    """Interface única para o modelo denso, independente do backend."""
+
+    def __init__(self, model: Any, backend: str):
+        self.model = model
+        self.backend = backend
+
+    def embed_documents(self, texts: List[str], batch_size: int = 32) -> np.ndarray:
+        if self.backend == "fastembed":
+            return np.stack(list(self.model.passage_embed(texts, batch_size=batch_size)))
+        return self.model.encode(
+            texts, batch_size=batch_size, show_progress_bar=False, convert_to_numpy=True
+        )
+
+    def embed_queries(self, texts: List[str], batch_size: int = 32) -> np.ndarray:
+        if self.backend == "fastembed":
+            return np.stack(list(self.model.query_embed(texts, batch_size=batch_size)))
+        return self.model.encode(
+            texts, batch_size=batch_size, show_progress_bar=False, convert_to_numpy=True
+        )
+
+
+class ModelRegistry:
+    def __init__(self, backend: str | None = None):
+        self._backend = backend or os.getenv("EMBEDDING_BACKEND", "fastembed")
+        self._validate_backend(self._backend)
+        self._models: Dict[Tuple[str, str], LoadedModel] = {}
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def _validate_backend(backend: str) -> None:
+        if backend not in BACKENDS:
+            raise ValueError(f"Backend de embeddings inválido: {backend!r}. Opções: {BACKENDS}")
+
+    @property
+    def backend(self) -> str:
+        return self._backend
+
+    def set_backend(self, backend: str) -> None:
+        """
+        Define o backend do modelo denso. Só pode mudar antes de qualquer
+        modelo denso ser carregado, para não manter duas cópias em memória.
+        """
+        self._validate_backend(backend)
+        with self._lock:
+            if backend == self._backend:
+                return
+            if any(kind == "dense" for kind, _ in self._models):
+                raise RuntimeError(
+                    f"Modelo denso já carregado com o backend {self._backend!r}; "
+                    f"não é possível trocar para {backend!r}."
+                )
+            self._backend = backend
+
+    def _get_or_load(self, kind: str, name: str, loader: Callable[[], Any]) -> Any:
+        key = (kind, name)
+        loaded = self._models.get(key)
+        if loaded is not None:
+            return loaded.model
+
+        with self._lock:
+            loaded = self._models.get(key)
+            if loaded is None:
+                rss_before = rss_bytes()
+                start = time.perf_counter()
+                model = loader()
+                loaded = LoadedModel(
+                    kind=kind,
+                    name=name,
+                    backend={"dense": self._backend, "tokenizer": "transformers"}.get(kind, "fastembed"),
+                    model=model,
+                    rss_delta_bytes=max(rss_bytes() - rss_before, 0),
+                    load_seconds=time.perf_counter() - start,
+                )
+                self._models[key] = loaded
+        return loaded.model
+
+    def tokenizer(self, name: str):
+        def load():
+            from transformers import AutoTokenizer
+            return AutoTokenizer.from_pretrained(name)
+
+        return self._get_or_load("tokenizer", name, load)
+
+    def dense(self, name: str) -> DenseEncoder:
+        def load():
+            if self._backend == "fastembed":
+                from fastembed import TextEmbedding
+                return DenseEncoder(TextEmbedding(name), "fastembed")
+
+            import torch
+            from sentence_transformers import SentenceTransformer
+            device = "cuda" if torch.cuda.is_available() else "cpu"
+            return DenseEncoder(SentenceTransformer(name, device=device), "sentence-transformers")
+
+        return self._get_or_load("dense", name, load)
+
+    def sparse(self, name: str):
+        def load():
+            from fastembed import SparseTextEmbedding
+            return SparseTextEmbedding(name)
+
+        return self._get_or_load("sparse", name, load)
+
+    def colbert(self, name: str):
+        def load():
+            from fastembed import LateInteractionTextEmbedding
+            return LateInteractionTextEmbedding(name)
+
+        return self._get_or_load("colbert", name, load)
+
+    def memory_report(self) -> List[Dict[str, Any]]:
+        """
+        Memória por modelo carregado.
+
+        rss_delta_bytes é o crescimento do RSS do processo durante o
+        carregamento (inclui arenas do runtime, então é uma estimativa);
+        parameters_bytes é o tamanho exato dos pesos quando o backend expõe
+        os parâmetros (PyTorch).
+        """
+        report = []
+        for loaded in list(self._models.values()):
+            parameters_bytes = None
+            inner = getattr(loaded.model, "model", loaded.model)
+            if hasattr(inner, "parameters"):
+                parameters_bytes = sum(p.numel() * p.element_size() for p in inner.parameters())
+
+            report.append({
+                "kind": loaded.kind,
+                "name": loaded.name,
+                "backend": loaded.backend,
+                "rss_delta_bytes": loaded.rss_delta_bytes,
+                "parameters_bytes": parameters_bytes,
+                "load_seconds": round(loaded.load_seconds, 3),
+            })
+        return report
+
+
+model_registry = ModelRegistry()
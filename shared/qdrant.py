@@ -0,0 +1,120 @@
+"""
+Clientes do Qdrant compartilhados pelo processo.
+
+A API e os scripts de ingestão pedem o cliente aqui em vez de construir o
+seu: há um QdrantClient e um AsyncQdrantClient por configuração, cada um com
+seu pool de conexões, reaproveitados por todos os serviços.
+
+- prefer_grpc: usa gRPC (porta grpc_port) nas operações que o suportam;
+  corta o custo por consulta, sobretudo com os multivetores do ColBERT
+- pool_size: conexões HTTP no pool (REST) ou canais gRPC
+- keepalive: segundos que uma conexão ociosa fica aberta (REST) ou intervalo
+  entre pings de keep-alive (gRPC)
+- timeout: segundos por operação
+
+Fora da API a configuração vem do ambiente (QDRANT_URL, QDRANT_API_KEY,
+QDRANT_PREFER_GRPC, QDRANT_GRPC_PORT, QDRANT_POOL_SIZE, QDRANT_KEEPALIVE,
+QDRANT_TIMEOUT), com os mesmos nomes das configurações da API.
+"""
+import os
+import threading
+from dataclasses import dataclass, replace
+from typing import Any, Dict
+
+import httpx
+from qdrant_client import AsyncQdrantClient, QdrantClient
+
+
+@dataclass(frozen=True)
+class QdrantConfig:
+    url: str | None
+    api_key: str | None = None
+    prefer_grpc: bool = False
+    grpc_port: int = 6334
+    pool_size: int = 16
+    keepalive: float = 30.0
+    timeout: int = 30
+
+    @classmethod
+    def from_env(cls, **overrides) -> "QdrantConfig":
+        config = cls(
+            url=os.getenv("QDRANT_URL"),
+            api_key=os.getenv("QDRANT_API_KEY"),
+            prefer_grpc=os.getenv("QDRANT_PREFER_GRPC", "false").lower() == "true",
+            grpc_port=int(os.getenv("QDRANT_GRPC_PORT", cls.grpc_port)),
+            pool_size=int(os.getenv("QDRANT_POOL_SIZE", cls.pool_size)),
+            keepalive=float(os.getenv("QDRANT_KEEPALIVE", cls.keepalive)),
+            timeout=int(os.getenv("QDRANT_TIMEOUT", cls.timeout)),
+        )
+        return replace(config, **overrides)
+
+    def client_kwargs(self) -> Dict[str, Any]:
+        kwargs: Dict[str, Any] = dict(
+            url=self.url,
+            api_key=self.api_key,
+            prefer_grpc=self.prefer_grpc,
+            grpc_port=self.grpc_port,
+            timeout=self.timeout,
+        )
+        if self.prefer_grpc:
+            # pool_size vira o número de canais gRPC (e o limite do pool REST
+            # usado nas operações sem gRPC)
+            kwargs["pool_size"] = self.pool_size
+            kwargs["grpc_options"] = {
+                "grpc.keepalive_time_ms": int(self.keepalive * 1000),
+                "grpc.keepalive_timeout_ms": int(self.timeout * 1000),
+            }
+        else:
+            # o cliente desliga o keep-alive para localhost; aqui vale o configurado
+            kwargs["limits"] = httpx.Limits(
+                max_connections=self.pool_size,
+                max_keepalive_connections=self.pool_size,
+                keepalive_expiry=self.keepalive,
+            )
+        return kwargs
+
+
+_lock = threading.Lock()
+_clients: Dict[QdrantConfig, QdrantClient] = {}
+_async_clients: Dict[QdrantConfig, AsyncQdrantClient] = {}
+
+
+def get_qdrant_client(config: QdrantConfig | None = None) -> QdrantClient:
+    """Cliente síncrono compartilhado para `config` (padrão: do ambiente)."""
+    config = config or QdrantConfig.from_env()
+    with _lock:
+        client = _clients.get(config)
+        if client is None:
+            client = _clients[config] = QdrantClient(**config.client_kwargs())
+    return client
+
+
+def get_async_qdrant_client(config: QdrantConfig | None = None) -> AsyncQdrantClient:
+    """
+    Cliente assíncrono compartilhado para `config`. Os canais gRPC assíncronos
+    ficam presos ao event loop em que foram abertos: use um único loop por processo.
+    """
+    config = config or QdrantConfig.from_env()
+    with _lock:
+        client = _async_clients.get(config)
+        if client is None:
+            client = _async_clients[config] = AsyncQdrantClient(**config.client_kwargs())
+    return client
+
+
+def close_qdrant_clients() -> None:
+    with _lock:
+        clients = list(_clients.values())
+        _clients.clear()
+    for client in clients:
+        client.close()
+
+
+async def aclose_qdrant_clients() -> None:
+    """Fecha todos os clientes (assíncronos e síncronos) criados por esta fábrica."""
+    with _lock:
+        clients = list(_async_clients.values())
+        _async_clients.clear()
+    for client in clients:
+        await client.close()
+    close_qdrant_clients()